@@ -0,0 +1,204 @@
+import json
+import os
+import re
+from types import MappingProxyType
+
+import yaml
+
+from render_cache import graph_fingerprint
+
+# Data model versions live in schemas/data_model_<version>.yaml; each is compiled once into a
+# JSON artifact under schemas/build/ that is reused for as long as its schema file is unchanged
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schemas")
+BUILD_DIR = os.path.join(SCHEMA_DIR, "build")
+SCHEMA_PATTERN = re.compile(r"^data_model_(.+)\.ya?ml$")
+
+# Bump when the artifact layout changes so stale artifacts are recompiled
+ARTIFACT_FORMAT = 1
+
+TIERS = ("module", "submodule", "subgroup", "field")
+ROOT_GROUP = "root"
+
+
+class SchemaError(ValueError):
+    """Raised when a data model schema is malformed or inconsistent."""
+
+
+def _version_key(version):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", version)]
+
+
+def _schema_files():
+    files = {}
+    for filename in os.listdir(SCHEMA_DIR):
+        match = SCHEMA_PATTERN.match(filename)
+        if match:
+            files[match.group(1)] = os.path.join(SCHEMA_DIR, filename)
+    return files
+
+
+def _mapping(schema, key, path):
+    value = schema.get(key, {})
+    if not isinstance(value, dict):
+        raise SchemaError(f"{path}: {key!r} must be a mapping")
+    return value
+
+
+def available_versions():
+    """Returns the data model versions found in the schema folder, oldest first."""
+    return sorted(_schema_files(), key=_version_key)
+
+
+def compile_schema(path):
+    """Validates a schema file and compiles it into a JSON-serialisable graph artifact.
+
+    The artifact holds the vis-network groups, every entity with its group
+    and title, the edges as `(source, target, label, direction)` and the
+    graph hash. Unknown groups, missing tier colours, duplicate entities,
+    malformed, duplicate or self links, links to or from undeclared entities
+    and a missing root raise `SchemaError`; entities no link reaches are kept
+    but reported in `warnings`.
+    """
+    with open(path, encoding="utf-8") as f:
+        schema = yaml.safe_load(f)
+    if not isinstance(schema, dict):
+        raise SchemaError(f"{path}: expected a mapping at the top level")
+    missing = [key for key in ("version", "root", "entities", "links") if key not in schema]
+    if missing:
+        raise SchemaError(f"{path}: missing {', '.join(missing)}")
+
+    node_settings = _mapping(schema, "node_settings", path)
+    groups = {ROOT_GROUP: dict(_mapping(schema, "root_style", path))}
+    for module, colors in _mapping(schema, "color_schemes", path).items():
+        missing = [tier for tier in TIERS if not isinstance(colors, dict) or tier not in colors]
+        if missing:
+            raise SchemaError(f"Colour scheme {module!r} has no colour for {', '.join(missing)}")
+        for tier in TIERS:
+            groups[f"{module}.{tier}"] = {"color": colors[tier], **node_settings.get(tier, {})}
+
+    tier_titles = _mapping(schema, "tier_titles", path)
+    titles = schema.get("titles") or {}
+    entities = {}
+    for group, names in _mapping(schema, "entities", path).items():
+        if group not in groups:
+            raise SchemaError(f"Unknown group {group!r}")
+        tier_title = tier_titles.get(group.rsplit(".", 1)[-1], "")
+        for name in names or []:
+            name = str(name)
+            if name in entities:
+                raise SchemaError(f"Entity {name!r} is declared more than once")
+            entities[name] = {"group": group, "title": titles.get(name, f"{name} {tier_title}".strip())}
+    root = str(schema["root"])
+    if entities.get(root, {}).get("group") != ROOT_GROUP:
+        raise SchemaError(f"Root {root!r} must be declared in the {ROOT_GROUP!r} group")
+    unknown_titles = set(titles) - set(entities)
+    if unknown_titles:
+        raise SchemaError(f"Titles given for undeclared entities: {', '.join(sorted(unknown_titles))}")
+
+    edges, dangling, linked = [], [], set()
+    for source, targets in _mapping(schema, "links", path).items():
+        source = str(source)
+        if not isinstance(targets, (list, type(None))):
+            raise SchemaError(f"Links of {source!r} must be a list")
+        for target in targets or []:
+            # A link is a target name, or a mapping with `to` and an optional label and direction
+            link = target if isinstance(target, dict) else {"to": target}
+            if "to" not in link:
+                raise SchemaError(f"A link of {source!r} has no 'to'")
+            target = str(link["to"])
+            if target == source:
+                raise SchemaError(f"{source!r} links to itself")
+            if (source, target) in linked:
+                raise SchemaError(f"Link {source} -> {target} is declared more than once")
+            linked.add((source, target))
+            dangling.extend(f"{source} -> {target}" for node in (source, target) if node not in entities)
+            edges.append((source, target, link.get("label", ""), link.get("direction", "")))
+    if dangling:
+        raise SchemaError(f"Links to undeclared entities: {', '.join(dict.fromkeys(dangling))}")
+
+    reached = {root} | {target for _, target, _, _ in edges}
+    warnings = [f"{name!r} is declared but no link leads to it" for name in entities if name not in reached]
+    return {
+        "format": ARTIFACT_FORMAT,
+        "version": str(schema["version"]),
+        "title": schema.get("title", ""),
+        "root": root,
+        "groups": groups,
+        "entities": entities,
+        "edges": edges,
+        "warnings": warnings,
+        "graph_hash": graph_fingerprint(entities, edges, groups),
+    }
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class DataModel:
+    """An immutable, validated data model graph compiled from a schema file."""
+
+    __slots__ = ("version", "title", "root", "groups", "entities", "edges", "warnings", "graph_hash")
+
+    def __init__(self, artifact):
+        for attribute in self.__slots__:
+            object.__setattr__(self, attribute, _freeze(artifact[attribute]))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DataModel is immutable")
+
+    def entity_tier(self, name):
+        """Returns the NODE_SETTINGS tier ("module", "submodule", "subgroup" or "field") of an entity."""
+        group = self.entities[name]["group"]
+        # The root is drawn larger than any module but sits at the module tier
+        return "module" if group == ROOT_GROUP else group.rsplit(".", 1)[1]
+
+
+def _read_artifact(path, stamp):
+    try:
+        with open(path, encoding="utf-8") as f:
+            artifact = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if artifact.get("format") != ARTIFACT_FORMAT or artifact.get("source") != stamp:
+        return None
+    return artifact
+
+
+def _write_artifact(path, artifact):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(artifact, f, separators=(",", ":"))
+        os.replace(temporary, path)
+    except OSError:
+        # A read-only deployment still works; the schema is then compiled once per process
+        pass
+
+
+def load_data_model(version=None):
+    """Returns the compiled data model for `version` (the latest one by default).
+
+    The compiled artifact is read in a single JSON load; the schema is only
+    parsed and validated again when its file changed since the last compile.
+    """
+    files = _schema_files()
+    if not files:
+        raise SchemaError(f"No data model schema found in {SCHEMA_DIR}")
+    version = version or max(files, key=_version_key)
+    if version not in files:
+        raise SchemaError(f"Unknown data model version {version!r}")
+
+    status = os.stat(files[version])
+    stamp = [status.st_mtime_ns, status.st_size]
+    path = os.path.join(BUILD_DIR, f"data_model_{version}.json")
+    artifact = _read_artifact(path, stamp)
+    if artifact is None:
+        artifact = {**compile_schema(files[version]), "source": stamp}
+        _write_artifact(path, artifact)
+    return DataModel(artifact)
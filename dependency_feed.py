@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+
+from ingest import MAX_REPORTED_ERRORS
+from inventory import DEPENDENCY_TYPES
+from inventory_graph import ADD, REMOVE
+
+
+def parse_event(line):
+    """Parses one JSON Lines dependency event into `(operation, source, target, dependency_type)`.
+
+    An event looks like `{"op": "add", "source": "System 1", "target":
+    "System 2", "dependency_type": "Downstream"}`; "op" is "add" or "remove".
+    Raises `ValueError` describing what is wrong with the line.
+    """
+    try:
+        event = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e.msg}") from None
+    if not isinstance(event, dict):
+        raise ValueError("An event must be a JSON object")
+    operation = event.get("op")
+    if operation not in (ADD, REMOVE):
+        raise ValueError(f"Unknown op {operation!r}; expected {ADD!r} or {REMOVE!r}")
+    missing = [field for field in ("source", "target", "dependency_type") if not event.get(field)]
+    if missing:
+        raise ValueError(f"Missing {', '.join(missing)}")
+    if event["dependency_type"] not in DEPENDENCY_TYPES:
+        raise ValueError(f"Unknown dependency type {event['dependency_type']!r}")
+    return operation, str(event["source"]), str(event["target"]), event["dependency_type"]
+
+
+class DependencyFeed:
+    """Tails a JSON Lines file of dependency events and applies each new batch to an inventory graph.
+
+    Only complete lines appended since the last poll are read, so a writer
+    may still be part-way through the last one. If the file shrinks it was
+    replaced, and it is read again from the start.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.line_number = 0
+        self.report = {"events_read": 0, "events_applied": 0, "error_count": 0, "errors": []}
+        self._lock = threading.Lock()
+
+    def read_events(self):
+        """Returns the events of the complete lines appended since the last read, recording invalid ones."""
+        if os.path.getsize(self.path) < self.offset:
+            self.offset, self.line_number = 0, 0
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+        data = data[:data.rfind(b"\n") + 1]
+        self.offset += len(data)
+
+        events = []
+        for line in data.decode("utf-8", errors="replace").splitlines():
+            self.line_number += 1
+            if not line.strip():
+                continue
+            try:
+                events.append(parse_event(line))
+            except ValueError as e:
+                self.report["error_count"] += 1
+                if len(self.report["errors"]) < MAX_REPORTED_ERRORS:
+                    self.report["errors"].append((self.line_number, str(e)))
+        self.report["events_read"] += len(events)
+        return events
+
+    def poll(self, inventory):
+        """Applies the events appended since the last poll to `inventory` and returns those applied."""
+        with self._lock:
+            if not os.path.exists(self.path):
+                return []
+            applied = inventory.apply_changes(self.read_events())
+            self.report["events_applied"] += len(applied)
+            return applied
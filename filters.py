@@ -0,0 +1,243 @@
+import re
+
+import numpy as np
+
+from ingest import DATE_COLUMNS, NUMBER_COLUMNS
+from inventory import CATEGORIES, UNKNOWN
+
+# Short names accepted for the filterable store columns; full column names work too
+FIELD_ALIASES = {
+    "criticality": "System Criticality",
+    "status": "System Status",
+    "agency": "Agency Name",
+    "ministry": "Ministry Family Name",
+    "ministry family": "Ministry Family Name",
+    "security": "Security Classification",
+    "sensitivity": "Sensitivity Classification",
+    "rml": "Computed RML",
+    "proposed rml": "Agency Proposed RML",
+    "endorsed rml": "Endorsed RML",
+    "alignment": "RML Alignment",
+    "availability": "Service Availability",
+}
+FILTER_COLUMNS = [
+    column for column in CATEGORIES if not column.startswith("Dependency")
+] + sorted(NUMBER_COLUMNS) + sorted(DATE_COLUMNS)
+
+ORDERED_OPERATORS = {"<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal}
+KEYWORDS = {"AND", "OR", "NOT", "IN"}
+
+TOKEN = re.compile(
+    r"""\s*(?:(?P<string>"[^"]*"|'[^']*')|(?P<op>!=|<=|>=|=|<|>)|(?P<punct>[(),])|(?P<word>[^\s()=!<>,"']+))"""
+)
+
+
+class FilterError(ValueError):
+    """Raised when a filter expression cannot be parsed or refers to unknown fields or values."""
+
+
+def _tokenize(expression):
+    tokens, position = [], 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = TOKEN.match(expression, position)
+        if not match or match.end() == position:
+            raise FilterError(f"Unexpected character at position {position + 1}: {expression[position:][:10]!r}")
+        kind = match.lastgroup
+        text = match.group(kind)
+        tokens.append((kind, text[1:-1] if kind == "string" else text))
+        position = match.end()
+    return tokens
+
+
+def _resolve_field(name):
+    key = " ".join(name.lower().split())
+    columns = {column.lower(): column for column in FILTER_COLUMNS}
+    column = FIELD_ALIASES.get(key) or columns.get(key)
+    if column is None:
+        known = ", ".join(sorted(FIELD_ALIASES))
+        raise FilterError(f"Unknown field {name!r}; use a column name or one of: {known}")
+    return column
+
+
+def _parse_value(column, text):
+    """Converts a typed value to what the column stores; None stands for a missing (Unknown) value."""
+    if text.lower() == UNKNOWN.lower():
+        return None
+    if column in CATEGORIES:
+        labels = {label.lower(): code for code, label in enumerate(CATEGORIES[column])}
+        if text.lower() not in labels:
+            raise FilterError(f"Unknown {column} {text!r}; expected one of: {', '.join(CATEGORIES[column])}")
+        return labels[text.lower()]
+    if column in NUMBER_COLUMNS:
+        try:
+            return float(text.rstrip("%"))
+        except ValueError:
+            raise FilterError(f"{column} needs a number, not {text!r}") from None
+    try:
+        return np.datetime64(text, "D")
+    except ValueError:
+        raise FilterError(f"{column} needs a date (YYYY-MM-DD), not {text!r}") from None
+
+
+class _Parser:
+    """Recursive-descent parser: OR binds loosest, then AND, then NOT."""
+
+    def __init__(self, expression):
+        self.tokens = _tokenize(expression)
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def keyword(self, word):
+        kind, text = self.peek()
+        if kind == "word" and text.upper() == word:
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, text):
+        if self.peek()[1] != text:
+            raise FilterError(f"Expected {text!r} but found {self.peek()[1] or 'the end'}")
+        self.position += 1
+
+    def parse(self):
+        if not self.tokens:
+            raise FilterError("Empty filter")
+        node = self.parse_or()
+        if self.position < len(self.tokens):
+            raise FilterError(f"Unexpected {self.peek()[1]!r}")
+        return node
+
+    def parse_or(self):
+        terms = [self.parse_and()]
+        while self.keyword("OR"):
+            terms.append(self.parse_and())
+        return terms[0] if len(terms) == 1 else ("or", terms)
+
+    def parse_and(self):
+        terms = [self.parse_not()]
+        while self.keyword("AND"):
+            terms.append(self.parse_not())
+        return terms[0] if len(terms) == 1 else ("and", terms)
+
+    def parse_not(self):
+        if self.keyword("NOT"):
+            return ("not", self.parse_not())
+        if self.peek()[1] == "(":
+            self.position += 1
+            node = self.parse_or()
+            self.expect(")")
+            return node
+        return self.parse_comparison()
+
+    def words(self, stop):
+        """Reads a possibly multi-word name or value, up to an operator, punctuation or a `stop` keyword."""
+        kind, text = self.peek()
+        if kind == "string":
+            self.position += 1
+            return text
+        words = []
+        while kind == "word" and text.upper() not in stop:
+            words.append(text)
+            self.position += 1
+            kind, text = self.peek()
+        if not words:
+            raise FilterError(f"Expected a field or value but found {text or 'the end'}")
+        return " ".join(words)
+
+    def parse_comparison(self):
+        column = _resolve_field(self.words(KEYWORDS))
+        if self.keyword("IN"):
+            self.expect("(")
+            values = [_parse_value(column, self.words({"AND", "OR"}))]
+            while self.peek()[1] == ",":
+                self.position += 1
+                values.append(_parse_value(column, self.words({"AND", "OR"})))
+            self.expect(")")
+            return ("in", column, values)
+        kind, operator = self.peek()
+        if kind != "op":
+            raise FilterError(f"Expected a comparison after {column!r}")
+        self.position += 1
+        value = _parse_value(column, self.words({"AND", "OR"}))
+        if operator in ORDERED_OPERATORS and (column in CATEGORIES or value is None):
+            raise FilterError(f"{operator} only compares numbers and dates")
+        return (operator, column, value)
+
+
+def _missing(column):
+    return np.isnat(column) if np.issubdtype(column.dtype, np.datetime64) else column < 0
+
+
+def _equal(column, value):
+    return _missing(column) if value is None else column == value
+
+
+def _evaluate(node, columns):
+    operator = node[0]
+    if operator in ("and", "or"):
+        masks = [_evaluate(term, columns) for term in node[1]]
+        return np.logical_and.reduce(masks) if operator == "and" else np.logical_or.reduce(masks)
+    if operator == "not":
+        return ~_evaluate(node[1], columns)
+    column = columns[node[1]]
+    if operator == "in":
+        known = [value for value in node[2] if value is not None]
+        mask = np.isin(column, known)
+        return mask | _missing(column) if None in node[2] else mask
+    if operator == "=":
+        return _equal(column, node[2])
+    if operator == "!=":
+        return ~_equal(column, node[2])
+    # Missing numbers and dates never satisfy an ordering
+    return ORDERED_OPERATORS[operator](column, node[2]) & ~_missing(column)
+
+
+def _format(node):
+    operator = node[0]
+    if operator in ("and", "or"):
+        return f" {operator.upper()} ".join(
+            f"({_format(term)})" if term[0] in ("and", "or") else _format(term) for term in node[1]
+        )
+    if operator == "not":
+        inner = _format(node[1])
+        return f"NOT ({inner})" if node[1][0] in ("and", "or") else f"NOT {inner}"
+
+    def label(value):
+        if value is None:
+            return UNKNOWN
+        if node[1] in CATEGORIES:
+            return f'"{CATEGORIES[node[1]][value]}"'
+        return f"{value:g}" if isinstance(value, float) else str(value)
+
+    if operator == "in":
+        return f"{node[1]} IN ({', '.join(label(value) for value in node[2])})"
+    return f"{node[1]} {operator} {label(node[2])}"
+
+
+class SystemFilter:
+    """A boolean filter over per-system attributes, compiled once and evaluated as vectorised masks.
+
+    Expressions combine comparisons with AND, OR, NOT and parentheses, e.g.
+    `criticality = High AND agency = Agency 3 AND alignment = Not Aligned`.
+    Categorical fields support `=`, `!=` and `IN (a, b)`; numbers and dates
+    also `<`, `<=`, `>` and `>=`. `Unknown` matches missing values.
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+        self._tree = _Parser(expression).parse()
+        self.canonical = _format(self._tree)
+
+    def __str__(self):
+        return self.canonical
+
+    def mask(self, store):
+        """Returns a boolean array marking the systems of `store` that match."""
+        return _evaluate(self._tree, store.columns)
+
+    def rows(self, store):
+        """Returns the rows of `store` that match."""
+        return np.flatnonzero(self.mask(store))
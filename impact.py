@@ -0,0 +1,497 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse import csgraph
+
+from inventory import DEPENDENCY_TYPES
+
+# Largest condensation whose reachable sets are precomputed as bitsets; larger ones are walked per query
+CLOSURE_LIMIT = 20_000
+# Per-query walks remembered until the next edge change
+RECENT_QUERIES = 64
+# Systems unpacked at a time when summing a block's reached bits
+UNPACK_ROWS = 8192
+# Most distinct weight rows counted class by class; beyond that each system is weighted separately
+WEIGHT_CLASSES = 64
+
+
+class ConnectivityIndex:
+    """Weakly connected component labels for the dependency graph.
+
+    Built once per graph version with a union-find, so looking up every
+    system connected to a given one, in either direction, is a dict lookup.
+    """
+
+    def __init__(self, nodes, edges):
+        parent = {node: node for node in nodes}
+        size = dict.fromkeys(parent, 1)
+
+        def find(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        for source, target in edges:
+            parent.setdefault(source, source)
+            parent.setdefault(target, target)
+            size.setdefault(source, 1)
+            size.setdefault(target, 1)
+            root_a, root_b = find(source), find(target)
+            if root_a == root_b:
+                continue
+            if size[root_a] < size[root_b]:
+                root_a, root_b = root_b, root_a
+            parent[root_b] = root_a
+            size[root_a] += size[root_b]
+
+        members = {}
+        for node in parent:
+            members.setdefault(find(node), []).append(node)
+        self.component = {}
+        self.members = []
+        for label, group in enumerate(members.values()):
+            self.members.append(frozenset(group))
+            for node in group:
+                self.component[node] = label
+
+    def __contains__(self, node):
+        return node in self.component
+
+    def impacted(self, node):
+        """Returns every system connected to `node` through any chain of dependencies, including itself."""
+        return self.members[self.component[node]]
+
+    def add_edges(self, pairs):
+        """Merges the components joined by new `(source, target)` edges, relabelling the smaller side."""
+        for source, target in pairs:
+            a, b = self.component[source], self.component[target]
+            if a == b:
+                continue
+            if len(self.members[a]) < len(self.members[b]):
+                a, b = b, a
+            for node in self.members[b]:
+                self.component[node] = a
+            self.members[a] = self.members[a] | self.members[b]
+            self.members[b] = frozenset()
+
+    def remove_edges(self, pairs, neighbours):
+        """Splits the components left disconnected once no edge joins the endpoints of `pairs`.
+
+        `neighbours(node)` lists a system's neighbours in the graph as it is
+        now. Only the components holding a removed edge are searched, and a
+        search stops as soon as it has reached every other endpoint.
+        """
+        endpoints = {}
+        for pair in pairs:
+            for node in pair:
+                endpoints.setdefault(self.component[node], set()).add(node)
+        for label, pending in endpoints.items():
+            while len(pending) > 1:
+                start = pending.pop()
+                reached = {start}
+                frontier = [start]
+                while frontier and not pending <= reached:
+                    frontier = {n for node in frontier for n in neighbours(node) if n not in reached}
+                    reached.update(frontier)
+                if pending <= reached:
+                    break
+                # `start` lost its last link to the rest, so its side becomes a component of its own
+                pending -= reached
+                for node in reached:
+                    self.component[node] = len(self.members)
+                self.members[label] = self.members[label] - reached
+                self.members.append(frozenset(reached))
+
+
+def impact_edges(dependencies):
+    """Yields (provider, dependent) pairs from (source, target, dependency_type) triples.
+
+    A "Downstream" edge points from a system to one that relies on it, while an
+    "Upstream" edge points from a system to one it relies on, so the latter is
+    reversed to make every edge follow the direction in which failures spread.
+    """
+    for source, target, dependency_type in dependencies:
+        if dependency_type == "Upstream":
+            yield target, source
+        else:
+            yield source, target
+
+
+def neighbourhood(G, node, hops, direction="both"):
+    """Returns the systems within `hops` steps of `node` in a failure-propagation graph.
+
+    `direction` is "downstream" (follow edges), "upstream" (follow them
+    backwards) or "both". Returns `(depth, hidden)`: the hop distance of every
+    system included, and for each system on the boundary how many of its
+    neighbours were left out.
+    """
+    def neighbours(system):
+        if direction in ("downstream", "both"):
+            yield from G.successors(system)
+        if direction in ("upstream", "both"):
+            yield from G.predecessors(system)
+
+    depth = {node: 0}
+    frontier = [node]
+    for hop in range(1, hops + 1):
+        reached = []
+        for system in frontier:
+            for neighbour in neighbours(system):
+                if neighbour not in depth:
+                    depth[neighbour] = hop
+                    reached.append(neighbour)
+        frontier = reached
+
+    hidden = {}
+    for system in frontier:
+        count = len({neighbour for neighbour in neighbours(system) if neighbour not in depth})
+        if count:
+            hidden[system] = count
+    return depth, hidden
+
+
+def _topological_order(count, links):
+    """Returns the components `0..count` in topological order of the acyclic `links` between them (Kahn)."""
+    children = [[] for _ in range(count)]
+    indegree = [0] * count
+    for a, b in links:
+        children[a].append(b)
+        indegree[b] += 1
+    order = [c for c in range(count) if not indegree[c]]
+    for c in order:
+        for child in children[c]:
+            indegree[child] -= 1
+            if not indegree[child]:
+                order.append(child)
+    return order
+
+
+class ReachabilityIndex:
+    """Directional reachability index over failure-propagation edges.
+
+    Strongly connected components are collapsed into an acyclic condensation.
+    Up to `CLOSURE_LIMIT` components, components are numbered in topological
+    order and each one stores its reachable set as a bitset (a Python int),
+    so reachability tests and blast-radius counts are single bit operations;
+    each direction's closure is built on first use. Closures grow with the
+    square of the component count, so larger inventories answer each query
+    with a breadth-first walk over the condensation instead, remembering the
+    last few answers. Bitset queries take microseconds; a walk costs the size
+    of the answer, a few milliseconds per count at 100k systems and tens of
+    milliseconds at 1M. Edges between components can be added and removed
+    afterwards; only the closures of the systems on either side of the edge
+    are touched.
+    """
+
+    def __init__(self, nodes, edges):
+        nodes = list(dict.fromkeys(nodes))
+        endpoints = [node for edge in edges for node in edge]
+        positions = pd.Index(nodes).get_indexer(endpoints)
+        if (positions < 0).any():
+            nodes += dict.fromkeys(endpoints[i] for i in np.flatnonzero(positions < 0).tolist())
+            positions = pd.Index(nodes).get_indexer(endpoints)
+        pairs = positions.astype(np.int64).reshape(-1, 2)
+        n = len(nodes)
+
+        if n:
+            adjacency = sp.csr_matrix((np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+            count, labels = csgraph.connected_components(adjacency, directed=True, connection="strong")
+        else:
+            count, labels = 0, np.empty(0, dtype=np.int64)
+        labels = labels.astype(np.int64)
+        source, target = labels[pairs[:, 0]], labels[pairs[:, 1]]
+        between = source != target
+        keys, multiplicity = np.unique(source[between] * count + target[between], return_counts=True)
+        links = np.column_stack([keys // count, keys % count]).reshape(-1, 2)
+        sizes = np.bincount(labels, minlength=count)
+
+        self._bitsets = count <= CLOSURE_LIMIT
+        if self._bitsets:
+            # Number components in topological order so each closure is built in one backward pass
+            rank = np.empty(count, dtype=np.int64)
+            rank[_topological_order(count, links.tolist())] = np.arange(count)
+            labels, links, sizes = rank[labels], rank[links], sizes[np.argsort(rank)]
+
+        self.component = dict(zip(nodes, labels.tolist()))
+        self._nodes = nodes
+        # Node positions grouped by component, so a component's members are one slice
+        self._grouped = np.argsort(labels, kind="stable")
+        self._bounds = np.searchsorted(labels[self._grouped], np.arange(count + 1))
+        self.children = [[] for _ in range(count)]
+        self.parents = [[] for _ in range(count)]
+        for a, b in links.tolist():
+            self.children[a].append(b)
+            self.parents[b].append(a)
+        self._sizes = sizes.astype(np.int64)
+        self._acyclic = bool((self._sizes == 1).all())
+        # Node edges between components, counted only where a component has several members
+        multiple = (self._sizes[links[:, 0]] > 1) | (self._sizes[links[:, 1]] > 1)
+        self._links = Counter(dict(zip(map(tuple, links[multiple].tolist()), multiplicity[multiple].tolist())))
+        self._closures = {}
+        self._recent = {}
+        # Component numbers follow a topological order until an added edge points backwards
+        self._ordered = self._bitsets
+
+    def __contains__(self, node):
+        return node in self.component
+
+    def _topological(self, group, edges):
+        """Returns the components of `group` ordered so each follows those it has `edges` to within the group."""
+        if self._ordered:
+            return sorted(group, reverse=edges is self.children)
+        group = set(group)
+        order, done = [], set()
+        for root in group:
+            if root in done:
+                continue
+            done.add(root)
+            stack = [(root, iter(edges[root]))]
+            while stack:
+                component, pending = stack[-1]
+                for other in pending:
+                    if other in group and other not in done:
+                        done.add(other)
+                        stack.append((other, iter(edges[other])))
+                        break
+                else:
+                    stack.pop()
+                    order.append(component)
+        return order
+
+    def _recompute(self, direction, group):
+        closure = self._closures[direction]
+        edges = self.children if direction == "downstream" else self.parents
+        # Children (or parents) always come first, so each closure is built from finished ones
+        for c in self._topological(group, edges):
+            bits = 0
+            for other in edges[c]:
+                bits |= closure[other] | (1 << other)
+            closure[c] = bits
+
+    def _closure(self, direction):
+        if direction not in self._closures:
+            self._closures[direction] = [0] * len(self._sizes)
+            self._recompute(direction, range(len(self._sizes)))
+        return self._closures[direction]
+
+    def _reachable(self, start, edges):
+        # Read off a built closure where there is one, else walk the component edges
+        direction = "downstream" if edges is self.children else "upstream"
+        if direction in self._closures:
+            return set(self._components(self._closures[direction][start]).tolist()) | {start}
+        reached = {start}
+        frontier = {start}
+        while frontier:
+            frontier = {other for c in frontier for other in edges[c] if other not in reached}
+            reached.update(frontier)
+        return reached
+
+    def _components(self, bits):
+        if not bits:
+            return np.empty(0, dtype=np.int64)
+        raw = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+        return np.flatnonzero(np.unpackbits(raw, bitorder="little"))
+
+    def _reached(self, direction, c):
+        """Returns the components reached from component `c` in `direction`, excluding `c` itself."""
+        if self._bitsets:
+            return self._components(self._closure(direction)[c])
+        reached = self._recent.get((direction, c))
+        if reached is None:
+            found = self._reachable(c, self.children if direction == "downstream" else self.parents)
+            found.discard(c)
+            reached = np.fromiter(found, dtype=np.int64, count=len(found))
+            if len(self._recent) >= RECENT_QUERIES:
+                self._recent.clear()
+            self._recent[direction, c] = reached
+        return reached
+
+    def _expand(self, node, direction):
+        c = self.component[node]
+        # Other members of a cycle reach each other in both directions
+        reached = np.concatenate([[c], self._reached(direction, c)]).astype(np.int64)
+        starts, counts = self._bounds[reached], self._sizes[reached]
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        result = {self._nodes[i] for i in self._grouped[positions].tolist()}
+        result.discard(node)
+        return frozenset(result)
+
+    def _count(self, node, direction):
+        c = self.component[node]
+        if self._bitsets and self._acyclic:
+            return self._closure(direction)[c].bit_count()
+        return int(self._sizes[c] - 1 + self._sizes[self._reached(direction, c)].sum())
+
+    def downstream(self, node):
+        """Returns the systems that break if `node` fails."""
+        return self._expand(node, "downstream")
+
+    def upstream(self, node):
+        """Returns the systems that `node` relies on, directly or transitively."""
+        return self._expand(node, "upstream")
+
+    def downstream_count(self, node):
+        """Returns how many systems break if `node` fails."""
+        return self._count(node, "downstream")
+
+    def upstream_count(self, node):
+        """Returns how many systems `node` relies on."""
+        return self._count(node, "upstream")
+
+    def add_edge(self, provider, dependent):
+        """Adds a failure-propagation edge to the index.
+
+        Returns `False` if the edge closes a cycle between components, which
+        merges them; the index must then be rebuilt instead.
+        """
+        a, b = self.component[provider], self.component[dependent]
+        if a == b:
+            return True
+        self._recent.clear()
+        if self._sizes[a] > 1 or self._sizes[b] > 1:
+            self._links[a, b] += 1
+        if b in self.children[a]:
+            return True
+        if "downstream" in self._closures:
+            cycle = bool(self._closures["downstream"][b] >> a & 1)
+        elif "upstream" in self._closures:
+            cycle = bool(self._closures["upstream"][a] >> b & 1)
+        else:
+            cycle = a in self._reachable(b, self.children)
+        if cycle:
+            return False
+        self.children[a].append(b)
+        self.parents[b].append(a)
+        if a > b:
+            self._ordered = False
+        for direction, start, gained, edges in (("downstream", a, b, self.parents), ("upstream", b, a, self.children)):
+            closure = self._closures.get(direction)
+            if closure is None:
+                continue
+            bits = closure[gained] | (1 << gained)
+            # Walk back from the edge, stopping wherever the gained systems were already reachable
+            frontier = [start]
+            while frontier:
+                c = frontier.pop()
+                if closure[c] | bits != closure[c]:
+                    closure[c] |= bits
+                    frontier.extend(edges[c])
+        return True
+
+    def remove_edge(self, provider, dependent):
+        """Removes a failure-propagation edge from the index.
+
+        Returns `False` if the edge ran inside a cycle, which may split it;
+        the index must then be rebuilt instead.
+        """
+        a, b = self.component[provider], self.component[dependent]
+        if a == b:
+            return provider == dependent
+        self._recent.clear()
+        if self._sizes[a] > 1 or self._sizes[b] > 1:
+            self._links[a, b] -= 1
+            if self._links[a, b] > 0:
+                return True
+            del self._links[a, b]
+        self.children[a].remove(b)
+        self.parents[b].remove(a)
+        # Only the systems upstream of the edge can lose downstream reach, and vice versa
+        for direction, start, edges in (("downstream", a, self.parents), ("upstream", b, self.children)):
+            if direction in self._closures:
+                self._recompute(direction, self._reachable(start, edges))
+        return True
+
+
+def spread_matrix(n, dependencies):
+    """Returns the transposed failure-propagation adjacency of `n` systems as a CSR matrix of ones.
+
+    `dependencies` holds the `source`/`target`/`type` row arrays of the
+    inventory; "Upstream" edges are reversed as in `impact_edges`. Row `i`
+    lists the providers whose failure reaches system `i` directly.
+    """
+    source = np.asarray(dependencies["source"], dtype=np.int64)
+    target = np.asarray(dependencies["target"], dtype=np.int64)
+    upstream = np.asarray(dependencies["type"]) == DEPENDENCY_TYPES.index("Upstream")
+    provider = np.where(upstream, target, source)
+    dependent = np.where(upstream, source, target)
+    keep = provider != dependent
+    spread = sp.csr_matrix(
+        (np.ones(int(keep.sum()), dtype=np.float32), (dependent[keep], provider[keep])), shape=(n, n)
+    )
+    spread.sum_duplicates()
+    spread.data[:] = 1
+    return spread
+
+
+def propagate(spread, sources, weights):
+    """Pushes a block of sources through `spread` until no new systems are reached.
+
+    Every system carries one bit per source of the block, packed into 64-bit
+    words, and each hop ORs the bits of the last hop's newly reached systems
+    into the systems they reach. Returns, per source, the number of systems
+    reached, the sums of the `weights` rows of those systems, and the impact
+    depth: the hop count of the shortest propagation path to the farthest
+    system reached.
+    """
+    n = spread.shape[0]
+    sources = np.asarray(sources, dtype=np.int64)
+    column = np.arange(len(sources))
+    word = column // 64
+    bit = np.left_shift(np.uint64(1), (column % 64).astype(np.uint64))
+    reached = np.zeros((n, -(-len(sources) // 64)), dtype=np.uint64)
+    np.bitwise_or.at(reached, (sources, word), bit)
+    # Row of every stored edge, so a hop is a gather over the edges leaving the frontier
+    edge_rows = np.repeat(np.arange(n), np.diff(spread.indptr))
+    position = np.full(n, -1, dtype=np.int64)
+    depth = np.zeros(len(sources), dtype=np.int64)
+    frontier_rows = np.unique(sources)
+    frontier = reached[frontier_rows]
+    level = 0
+    while len(frontier_rows):
+        position[:] = -1
+        position[frontier_rows] = np.arange(len(frontier_rows))
+        edges = np.flatnonzero(position[spread.indices] >= 0)
+        if not len(edges):
+            break
+        rows = edge_rows[edges]
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        rows = rows[starts]
+        bits = np.bitwise_or.reduceat(frontier[position[spread.indices[edges]]], starts, axis=0)
+        bits &= ~reached[rows]
+        new = bits.any(axis=1)
+        if not new.any():
+            break
+        frontier_rows, frontier = rows[new], bits[new]
+        reached[frontier_rows] |= frontier
+        level += 1
+        depth[(np.bitwise_or.reduce(frontier, axis=0)[word] & bit) != 0] = level
+    # A source only reaches itself through a cycle; exclude it as the index does
+    np.bitwise_and.at(reached, (sources, word), ~bit)
+
+    # Systems of equal weight are counted together, leaving one small product per block
+    classes, inverse = np.unique(weights, axis=0, return_inverse=True)
+    if len(classes) <= WEIGHT_CLASSES:
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.searchsorted(inverse[order], np.arange(len(classes) + 1))
+        class_counts = np.zeros((len(classes), len(sources)), dtype=np.int64)
+        for c in range(len(classes)):
+            for flags in _unpacked(reached, order[bounds[c]:bounds[c + 1]], len(sources)):
+                class_counts[c] += flags.sum(axis=0, dtype=np.int64)
+        return class_counts.sum(axis=0), class_counts.T @ classes, depth
+
+    counts = np.zeros(len(sources), dtype=np.int64)
+    weighted = np.zeros((len(sources),) + np.shape(weights)[1:])
+    for start, flags in zip(range(0, n, UNPACK_ROWS), _unpacked(reached, np.arange(n), len(sources))):
+        counts += flags.sum(axis=0, dtype=np.int64)
+        weighted += flags.T.astype(np.float64) @ weights[start:start + UNPACK_ROWS]
+    return counts, weighted, depth
+
+
+def _unpacked(bits, rows, width):
+    """Yields the first `width` bits of `rows`, one byte per bit, `UNPACK_ROWS` rows at a time."""
+    for start in range(0, len(rows), UNPACK_ROWS):
+        block = bits[rows[start:start + UNPACK_ROWS]]
+        yield np.unpackbits(block.view(np.uint8), axis=1, bitorder="little")[:, :width]
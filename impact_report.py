@@ -0,0 +1,119 @@
+"""Headless impact report: computes per-system impact analytics and writes them as CSV or JSON Lines.
+
+Uses the same inventory loaders and impact analytics as the Streamlit app
+without importing Streamlit or pyvis, so it starts quickly in cron jobs:
+
+    python impact_report.py --synthetic 10000 --seed 0 -o report.csv
+    python impact_report.py --systems systems.csv --dependencies deps.csv -o report.jsonl
+    python impact_report.py --sqlite inventory.db --system "System 3" --system "System 7"
+
+Rows are written in inventory order as they are computed; --ranked buffers
+the whole report to sort it by criticality-weighted impact first.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+
+from ingest import IngestError, ingest_inventory
+from inventory import SystemStore, generate_inventory
+from parallel_impact import criticality_weights, impact_chunks, impact_table
+from sqlite_store import SqliteStore
+
+
+def load_inventory(args):
+    """Returns `(store, dependency arrays)` from the source selected on the command line."""
+    if args.synthetic is not None:
+        columns, dependencies = generate_inventory(args.synthetic, seed=args.seed)
+        store = SystemStore(columns)
+    elif args.sqlite is not None:
+        if not os.path.exists(args.sqlite):
+            raise IngestError(f"No SQLite store at {args.sqlite}")
+        with SqliteStore(args.sqlite) as sqlite_store:
+            if not len(sqlite_store):
+                raise IngestError(f"No inventory saved in {args.sqlite}")
+            store, dependencies = sqlite_store.load()
+    else:
+        store, dependencies, reports = ingest_inventory(args.systems, args.dependencies)
+        for name, report in reports.items():
+            if report["error_count"]:
+                print(f"{name}: skipped {report['error_count']} invalid rows", file=sys.stderr)
+    return store, dependencies
+
+
+def selected_rows(store, args):
+    """Returns the rows of the systems listed with --system/--system-list, or None for every system."""
+    names = list(args.system or [])
+    if args.system_list:
+        with open(args.system_list, encoding="utf-8") as f:
+            names.extend(line.strip() for line in f if line.strip())
+    if not names:
+        return None
+    unknown = [name for name in names if name not in store]
+    if unknown:
+        raise IngestError(f"Unknown systems: {', '.join(unknown)}")
+    return [store.position(name) for name in names]
+
+
+def write_report(chunks, output, output_format):
+    """Writes the report tables in `chunks` to `output` (a path, or "-" for stdout) as they arrive."""
+    stream = sys.stdout if output == "-" else open(output, "w", encoding="utf-8", newline="")
+    try:
+        for i, chunk in enumerate(chunks):
+            if output_format == "csv":
+                chunk.to_csv(stream, header=i == 0, index=False)
+            elif len(chunk):
+                chunk.to_json(stream, orient="records", lines=True)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compute per-system impact analytics without the Streamlit UI.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--synthetic", type=int, metavar="N", help="generate a synthetic inventory of N systems")
+    source.add_argument("--systems", metavar="FILE", help="systems export to ingest (CSV or Excel)")
+    source.add_argument("--sqlite", metavar="DB", help="SQLite store saved from the app")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the synthetic inventory")
+    parser.add_argument("--dependencies", metavar="FILE", help="dependencies export to ingest with --systems")
+    parser.add_argument("--system", action="append", metavar="NAME", help="report only this system (repeatable)")
+    parser.add_argument("--system-list", metavar="FILE", help="report only the systems named in FILE, one per line")
+    parser.add_argument("-o", "--output", default="-", help="output file, or - for stdout (default)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="output format (default: from the file suffix, else csv)")
+    parser.add_argument("--processes", type=int, help="worker processes (default: every core)")
+    parser.add_argument("--ranked", action="store_true", help="sort by criticality-weighted impact (buffers the report)")
+    args = parser.parse_args(argv)
+    if args.dependencies and not args.systems:
+        parser.error("--dependencies needs --systems")
+    if args.format is None:
+        args.format = "jsonl" if args.output.lower().endswith((".jsonl", ".ndjson")) else "csv"
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        store, dependencies = load_inventory(args)
+        rows = selected_rows(store, args)
+    except (IngestError, OSError, sqlite3.Error) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    weights = criticality_weights(store)
+    if args.ranked:
+        table = impact_table(store, dependencies, weights, rows=rows, processes=args.processes)
+        # Same order as the app's impact ranking
+        chunks = [table.sort_values(["Weighted Impact", "Downstream Systems"], ascending=False)]
+    else:
+        chunks = impact_chunks(store, dependencies, weights, rows=rows, processes=args.processes)
+    try:
+        write_report(chunks, args.output, args.format)
+    except BrokenPipeError:
+        # The reader (e.g. `head`) stopped early; silence the flush at exit
+        sys.stdout = open(os.devnull, "w")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
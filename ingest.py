@@ -0,0 +1,244 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_model import SchemaError, load_data_model
+from inventory import CATEGORIES, DEPENDENCY_STATUS, DEPENDENCY_TYPES, SystemStore, score_rml
+
+# Inventory file headers (data model field names) and the store column each one fills
+SYSTEM_FIELDS = {
+    "System ID": "System ID",
+    "System Status": "System Status",
+    "Operational Date": "Operational Date",
+    "Decommission Date": "Decommission Date",
+    "Agency Name": "Agency Name",
+    "Ministry Family": "Ministry Family Name",
+    "Security Classification": "Security Classification",
+    "Sensitivity Classification": "Sensitivity Classification",
+    "System Criticality": "System Criticality",
+    "Computed RML Date": "Computed RML Date",
+    "Agency Proposed RML": "Agency Proposed RML",
+    "Endorsed RML": "Endorsed RML",
+    "RML Endorsement Date": "RML Endorsement Date",
+    "Service Availability": "Service Availability",
+    "RECOVERY TIME OBJECTIVE": "RTO",
+    "RECOVERY POINT OBJECTIVE": "RPO",
+}
+# Store columns derived from the RML rules; these headers are ignored like any unknown column
+DERIVED_FIELDS = ["Computed RML", "RML Alignment"]
+REQUIRED_SYSTEM_FIELDS = ["System ID", "System Name", "Agency Name", "Ministry Family", "System Criticality"]
+
+DEPENDENCY_FIELDS = ["System ID", "Dependent System", "Dependency Type", "Dependency Status"]
+REQUIRED_DEPENDENCY_FIELDS = ["System ID", "Dependent System", "Dependency Type"]
+
+DATE_COLUMNS = {"Operational Date", "Decommission Date", "Computed RML Date", "RML Endorsement Date"}
+NUMBER_COLUMNS = {"Service Availability", "RTO", "RPO"}
+
+MAX_REPORTED_ERRORS = 100
+EXCEL_SUFFIXES = (".xlsx", ".xlsm")
+
+
+class IngestError(ValueError):
+    """Raised when an inventory file cannot be ingested at all (e.g. missing columns)."""
+
+
+def _check_headers_declared():
+    """Raises `IngestError` unless every accepted header is a field of the latest data model."""
+    try:
+        model = load_data_model()
+    except SchemaError as e:
+        raise IngestError(f"Cannot check headers against the data model: {e}") from e
+    undeclared = sorted((set(SYSTEM_FIELDS) | set(REQUIRED_SYSTEM_FIELDS) | set(DEPENDENCY_FIELDS)) - set(model.entities))
+    if undeclared:
+        raise IngestError(f"Headers not declared in data model {model.version}: {', '.join(undeclared)}")
+
+
+def _source_name(source):
+    return source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", "")
+
+
+def _excel_chunks(source, chunksize):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise IngestError("Reading Excel inventories requires openpyxl") from e
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else "" for cell in next(rows, [])]
+        batch = []
+        for row in rows:
+            batch.append(["" if cell is None else str(cell) for cell in row])
+            if len(batch) == chunksize:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+def read_chunks(source, chunksize=50_000):
+    """Yields DataFrames of string cells from a CSV or Excel file, `chunksize` rows at a time."""
+    if str(_source_name(source)).lower().endswith(EXCEL_SUFFIXES):
+        yield from _excel_chunks(source, chunksize)
+        return
+    reader = pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            chunk.columns = [str(column).strip() for column in chunk.columns]
+            yield chunk
+
+
+def _check_columns(chunk, required, accepted, report):
+    missing = [field for field in required if field not in chunk.columns]
+    if missing:
+        raise IngestError(f"Missing required columns: {', '.join(missing)}")
+    report["ignored_columns"] = [column for column in chunk.columns if column not in accepted]
+
+
+def _reject(report, row_numbers, mask, message):
+    """Records rows where `mask` is set as invalid and returns the mask of rows still valid."""
+    rejected = row_numbers[mask]
+    report["error_count"] += len(rejected)
+    for row in rejected[:max(0, MAX_REPORTED_ERRORS - len(report["errors"]))]:
+        report["errors"].append((int(row), message))
+    return ~mask
+
+
+def _encode_categories(values, categories):
+    codes = values.map({label: code for code, label in enumerate(categories)})
+    invalid = codes.isna() & (values != "")
+    return codes.fillna(-1).to_numpy(dtype=np.int8), invalid.to_numpy()
+
+
+def _new_report():
+    return {"rows_read": 0, "rows_loaded": 0, "error_count": 0, "errors": [], "ignored_columns": []}
+
+
+class InventoryBuilder:
+    """Builds the columnar store and dependency arrays incrementally, one chunk at a time.
+
+    Only compact per-chunk arrays are kept between chunks, so peak memory is
+    the coded inventory plus a single chunk of raw rows.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.row_of_id = {}
+        self._known_names = set()
+        self._columns = {column: [] for column in SYSTEM_FIELDS.values()}
+        self._columns["Dependency Type"] = []
+        self._columns["Dependency Status"] = []
+        self._dependencies = {"source": [], "target": [], "type": []}
+        self.systems_report = _new_report()
+        self.dependencies_report = _new_report()
+
+    def add_systems(self, chunk):
+        """Validates one chunk of inventory rows and appends the valid ones."""
+        report = self.systems_report
+        if report["rows_read"] == 0:
+            _check_columns(chunk, REQUIRED_SYSTEM_FIELDS, set(SYSTEM_FIELDS) | {"System Name"}, report)
+        # Header is row 1, so data rows are numbered from 2 as in a spreadsheet
+        row_numbers = np.arange(len(chunk)) + report["rows_read"] + 2
+        report["rows_read"] += len(chunk)
+        chunk = chunk.apply(lambda column: column.str.strip())
+
+        valid = np.ones(len(chunk), dtype=bool)
+        for field in REQUIRED_SYSTEM_FIELDS:
+            valid &= _reject(report, row_numbers, valid & (chunk[field] == "").to_numpy(), f"Missing {field}")
+        duplicate = chunk["System ID"].duplicated().to_numpy() | chunk["System ID"].isin(self.row_of_id).to_numpy()
+        valid &= _reject(report, row_numbers, valid & duplicate, "Duplicate System ID")
+        # Systems are graph nodes keyed by name, so a repeated name would merge two systems
+        duplicate = chunk["System Name"].duplicated().to_numpy() | chunk["System Name"].isin(self._known_names).to_numpy()
+        valid &= _reject(report, row_numbers, valid & duplicate, "Duplicate System Name")
+
+        coded = {}
+        for header, column in SYSTEM_FIELDS.items():
+            values = chunk[header] if header in chunk.columns else pd.Series("", index=chunk.index)
+            if column in CATEGORIES:
+                coded[column], invalid = _encode_categories(values, CATEGORIES[column])
+                valid &= _reject(report, row_numbers, valid & invalid, f"Unknown {header}")
+            elif column in DATE_COLUMNS:
+                dates = pd.to_datetime(values.replace("", None), errors="coerce")
+                valid &= _reject(report, row_numbers, valid & (dates.isna() & (values != "")).to_numpy(), f"Invalid {header}")
+                coded[column] = dates.to_numpy(dtype="datetime64[D]")
+            elif column in NUMBER_COLUMNS:
+                numbers = pd.to_numeric(values.str.extract(r"(\d+)", expand=False), errors="coerce")
+                valid &= _reject(report, row_numbers, valid & (numbers.isna() & (values != "")).to_numpy(), f"Invalid {header}")
+                coded[column] = numbers.fillna(-1).to_numpy(dtype=np.int16)
+            else:
+                coded[column] = values.to_numpy(dtype=object)
+        coded["Dependency Type"] = np.full(len(chunk), -1, dtype=np.int8)
+        coded["Dependency Status"] = np.full(len(chunk), -1, dtype=np.int8)
+
+        for column, values in coded.items():
+            self._columns[column].append(values[valid])
+        start = len(self.names)
+        for offset, system_id in enumerate(chunk["System ID"].to_numpy()[valid]):
+            self.row_of_id[system_id] = start + offset
+        names = chunk["System Name"].to_numpy()[valid].tolist()
+        self.names.extend(names)
+        self._known_names.update(names)
+        report["rows_loaded"] += int(valid.sum())
+
+    def add_dependencies(self, chunk):
+        """Validates one chunk of dependency rows against the loaded systems and appends the valid ones."""
+        report = self.dependencies_report
+        if report["rows_read"] == 0:
+            _check_columns(chunk, REQUIRED_DEPENDENCY_FIELDS, set(DEPENDENCY_FIELDS) | {"Dependency ID"}, report)
+        row_numbers = np.arange(len(chunk)) + report["rows_read"] + 2
+        report["rows_read"] += len(chunk)
+        chunk = chunk.apply(lambda column: column.str.strip())
+
+        source = chunk["System ID"].map(self.row_of_id)
+        target = chunk["Dependent System"].map(self.row_of_id)
+        dep_type, invalid_type = _encode_categories(chunk["Dependency Type"], DEPENDENCY_TYPES)
+        valid = _reject(report, row_numbers, source.isna().to_numpy(), "Unknown System ID")
+        valid &= _reject(report, row_numbers, valid & target.isna().to_numpy(), "Unknown Dependent System")
+        valid &= _reject(report, row_numbers, valid & (invalid_type | (dep_type < 0)), "Invalid Dependency Type")
+        if "Dependency Status" in chunk.columns:
+            _, invalid_status = _encode_categories(chunk["Dependency Status"], DEPENDENCY_STATUS)
+            valid &= _reject(report, row_numbers, valid & invalid_status, "Invalid Dependency Status")
+
+        self._dependencies["source"].append(source.to_numpy()[valid].astype(np.int64))
+        self._dependencies["target"].append(target.to_numpy()[valid].astype(np.int64))
+        self._dependencies["type"].append(dep_type[valid])
+        report["rows_loaded"] += int(valid.sum())
+
+    def build(self):
+        """Returns `(store, dependencies)` from everything added so far."""
+        columns = {
+            column: np.concatenate(parts) if parts else np.empty(0)
+            for column, parts in self._columns.items()
+        }
+        for column in DERIVED_FIELDS:
+            columns[column] = np.full(len(self.names), -1, dtype=np.int8)
+        score_rml(columns)
+        dependencies = {
+            key: np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+            for key, parts in self._dependencies.items()
+        }
+        return SystemStore(columns, names=self.names), dependencies
+
+
+def ingest_inventory(systems_source, dependencies_source=None, chunksize=50_000):
+    """Streams inventory and dependency exports (CSV or Excel) into a store and dependency arrays.
+
+    Returns `(store, dependencies, reports)`, where `reports` holds the row
+    counts and the first validation errors for each file. Raises
+    `IngestError` if the files cannot be ingested at all.
+    """
+    _check_headers_declared()
+    builder = InventoryBuilder()
+    for chunk in read_chunks(systems_source, chunksize):
+        builder.add_systems(chunk)
+    if dependencies_source is not None:
+        for chunk in read_chunks(dependencies_source, chunksize):
+            builder.add_dependencies(chunk)
+    store, dependencies = builder.build()
+    for report in (builder.systems_report, builder.dependencies_report):
+        report["errors"].sort()
+    return store, dependencies, {"systems": builder.systems_report, "dependencies": builder.dependencies_report}
@@ -0,0 +1,357 @@
+import hashlib
+from datetime import date
+
+import numpy as np
+
+# Category labels for every coded field, in code order
+AGENCIES = ["Agency 1", "Agency 2", "Agency 3", "Agency 4", "Agency 5", "Agency 6", "Agency 7", "Agency 8"]
+MINISTRY_FAMILIES = ["MF 1", "MF 2", "MF 3", "MF 4", "MF 5"]
+SECURITY_CLASSIFICATIONS = ["Official", "Restricted", "Confidential", "Secret"]
+SENSITIVITY_CLASSIFICATIONS = ["Sensitive Normal", "Non-Sensitive", "Sensitive High"]
+SYSTEM_CRITICALITY = ["Others", "SII", "High"]
+RML_LEVELS = ["Low", "Medium", "High"]
+RML_ALIGNMENT = ["Aligned", "Not Aligned"]
+SYSTEM_STATUS = ["Active", "Inactive", "Maintenance"]
+DEPENDENCY_TYPES = ["Upstream", "Downstream"]
+DEPENDENCY_STATUS = ["Active", "Inactive"]
+
+CATEGORIES = {
+    "System Status": SYSTEM_STATUS,
+    "Agency Name": AGENCIES,
+    "Ministry Family Name": MINISTRY_FAMILIES,
+    "Security Classification": SECURITY_CLASSIFICATIONS,
+    "Sensitivity Classification": SENSITIVITY_CLASSIFICATIONS,
+    "System Criticality": SYSTEM_CRITICALITY,
+    "Computed RML": RML_LEVELS,
+    "Agency Proposed RML": RML_LEVELS,
+    "RML Alignment": RML_ALIGNMENT,
+    "Endorsed RML": RML_LEVELS,
+    "Dependency Type": DEPENDENCY_TYPES,
+    "Dependency Status": DEPENDENCY_STATUS,
+}
+
+UNKNOWN = "Unknown"
+
+OTHERS, SII, HIGH = range(3)
+LOW, MEDIUM = 0, 1
+UPSTREAM, DOWNSTREAM = 0, 1
+
+NUM_LAYERS = 10
+
+# Computed RML rules: each input field sets a floor on the RML and the highest floor wins.
+# Codes are shifted by one when looking up, so a missing value (-1) uses the first entry.
+RML_INPUTS = {
+    "System Criticality": {"Others": LOW, "SII": MEDIUM, "High": HIGH},
+    "Security Classification": {"Official": LOW, "Restricted": LOW, "Confidential": MEDIUM, "Secret": HIGH},
+    "Sensitivity Classification": {"Non-Sensitive": LOW, "Sensitive Normal": MEDIUM, "Sensitive High": HIGH},
+}
+ALIGNED, NOT_ALIGNED = 0, 1
+
+
+def _rml_table():
+    # One cell per combination of input codes (missing included): a missing input leaves the
+    # RML unknown unless a known input already demands the highest level
+    floors = [
+        np.array([-1] + [rules[label] for label in CATEGORIES[field]], dtype=np.int8)
+        for field, rules in RML_INPUTS.items()
+    ]
+    grid = np.meshgrid(*floors, indexing="ij")
+    highest = np.maximum.reduce(grid)
+    missing = np.logical_or.reduce([floor < 0 for floor in grid])
+    return np.where(missing & (highest < HIGH), -1, highest).astype(np.int8)
+
+
+def _alignment_table():
+    levels = np.arange(-1, len(RML_LEVELS))
+    table = np.where(levels[:, None] == levels[None, :], ALIGNED, NOT_ALIGNED)
+    table[0, :] = table[:, 0] = -1
+    return table.astype(np.int8)
+
+
+RML_TABLE = _rml_table()
+ALIGNMENT_TABLE = _alignment_table()
+
+
+def compute_rml(criticality, security, sensitivity):
+    """Returns the Computed RML codes for arrays of System Criticality, Security and Sensitivity codes."""
+    return RML_TABLE[criticality.astype(np.intp) + 1, security.astype(np.intp) + 1, sensitivity.astype(np.intp) + 1]
+
+
+def rml_alignment(computed, endorsed):
+    """Returns the RML Alignment codes: Aligned where the Computed RML equals the Endorsed RML."""
+    return ALIGNMENT_TABLE[computed.astype(np.intp) + 1, endorsed.astype(np.intp) + 1]
+
+
+def score_rml(columns, rows=None):
+    """Evaluates Computed RML and RML Alignment in place, for every system or only for `rows`."""
+    rows = slice(None) if rows is None else rows
+    computed = compute_rml(*(columns[field][rows] for field in RML_INPUTS))
+    columns["Computed RML"][rows] = computed
+    columns["RML Alignment"][rows] = rml_alignment(computed, columns["Endorsed RML"][rows])
+
+
+def update_rml_input(columns, field, rows, values):
+    """Sets `field` to `values` for `rows` and rescores only those rows.
+
+    `field` is an RML input or Endorsed RML. Rows whose Computed RML changes
+    get today's Computed RML Date; their positions are returned.
+    """
+    if field not in RML_INPUTS and field != "Endorsed RML":
+        raise KeyError(f"{field} is not an input of the RML rules")
+    rows = np.asarray(rows, dtype=np.int64)
+    columns[field][rows] = values
+    before = columns["Computed RML"][rows]
+    score_rml(columns, rows)
+    changed = rows[columns["Computed RML"][rows] != before]
+    columns["Computed RML Date"][changed] = np.datetime64(date.today(), "D")
+    return changed
+
+
+def _random_dates(rng, size, start_year):
+    start = np.datetime64(date(start_year, 1, 1), "D")
+    span = max((np.datetime64(date.today(), "D") - start).astype(int), 1)
+    return start + rng.integers(0, span, size).astype("timedelta64[D]")
+
+
+def _layer_sizes(rng, num_systems, top_size):
+    # Same proportions as the original 50-system hierarchy: 4-8 systems per
+    # upper-middle layer and 2-5 per lower layer, scaled to the inventory size
+    scale = num_systems / 50
+    sizes = [top_size]
+    for layer_idx in range(1, NUM_LAYERS):
+        low, high = (4, 8) if layer_idx < 5 else (2, 5)
+        sizes.append(int(round(rng.uniform(low, high) * scale)))
+    return sizes
+
+
+def _layer_edges(rng, sources, targets, low, high):
+    """Links every source to `low`..`high` distinct targets (fewer if the layer is smaller)."""
+    counts = np.minimum(rng.integers(low, high + 1, len(sources)), len(targets))
+    starts = rng.integers(0, len(targets), len(sources))
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(sources, counts), targets[(np.repeat(starts, counts) + offsets) % len(targets)]
+
+
+def generate_inventory(num_systems, seed=None):
+    """Generates a synthetic inventory of `num_systems` systems and their layered dependencies.
+
+    Returns `(columns, dependencies)`: `columns` maps field names to arrays
+    (integer codes into the category lists above for categorical fields),
+    and `dependencies` holds `source`, `target` and `type` arrays of system
+    indices. Runs in time linear in the number of systems.
+    """
+    rng = np.random.default_rng(seed)
+    n = num_systems
+
+    criticality = rng.integers(0, 3, n).astype(np.int8)
+    security = rng.integers(0, len(SECURITY_CLASSIFICATIONS), n).astype(np.int8)
+    sensitivity = rng.integers(0, len(SENSITIVITY_CLASSIFICATIONS), n).astype(np.int8)
+    # Agencies mostly propose, and get endorsed, the level the rules compute; one in five differs
+    computed_rml = compute_rml(criticality, security, sensitivity)
+    agency_proposed_rml = np.where(rng.random(n) < 0.2, rng.integers(0, 3, n), computed_rml).astype(np.int8)
+    endorsed_rml = np.where(rng.random(n) < 0.2, rng.integers(0, 3, n), computed_rml).astype(np.int8)
+
+    columns = {
+        "System ID": rng.integers(1000, 10000, n).astype(np.int16),
+        "System Status": rng.integers(0, len(SYSTEM_STATUS), n).astype(np.int8),
+        "Operational Date": _random_dates(rng, n, 2015),
+        "Decommission Date": _random_dates(rng, n, 2025),
+        "Agency Name": rng.integers(0, len(AGENCIES), n).astype(np.int8),
+        "Ministry Family Name": rng.integers(0, len(MINISTRY_FAMILIES), n).astype(np.int8),
+        "Security Classification": security,
+        "Sensitivity Classification": sensitivity,
+        "System Criticality": criticality,
+        "Computed RML": computed_rml,
+        "Computed RML Date": _random_dates(rng, n, 2015),
+        "Agency Proposed RML": agency_proposed_rml,
+        "RML Alignment": rml_alignment(computed_rml, endorsed_rml),
+        "Endorsed RML": endorsed_rml,
+        "RML Endorsement Date": _random_dates(rng, n, 2015),
+        "Service Availability": rng.integers(90, 101, n).astype(np.int8),
+        "RTO": rng.integers(1, 25, n).astype(np.int8),
+        "RPO": rng.integers(1, 13, n).astype(np.int8),
+        "Dependency Type": rng.integers(0, len(DEPENDENCY_TYPES), n).astype(np.int8),
+        "Dependency Status": rng.integers(0, len(DEPENDENCY_STATUS), n).astype(np.int8),
+    }
+
+    # Layer 0 holds High criticality systems first, then SII, one tenth of the inventory
+    top_size = max(1, round(n / 10))
+    candidates = np.concatenate([np.flatnonzero(criticality == HIGH), np.flatnonzero(criticality == SII)])
+    top = candidates[:top_size]
+    is_top = np.zeros(n, dtype=bool)
+    is_top[top] = True
+    remaining = rng.permutation(np.flatnonzero(~is_top))
+
+    # Cut the shuffled remainder into the lower layers; leftovers stay unconnected
+    layers = [top]
+    bounds = np.cumsum(_layer_sizes(rng, n, len(top))[1:])
+    starts = np.concatenate([[0], bounds[:-1]])
+    for start, stop in zip(starts, bounds):
+        layers.append(remaining[min(start, len(remaining)):min(stop, len(remaining))])
+
+    sources, targets, types = [], [], []
+
+    def add(src, dst, dep_type):
+        sources.append(src)
+        targets.append(dst)
+        types.append(np.full(len(src), dep_type, dtype=np.int8))
+
+    # 2-4 downstream dependencies into the next layer, 30% of them followed by a skip connection
+    for layer_idx in range(NUM_LAYERS - 1):
+        current_layer, next_layer = layers[layer_idx], layers[layer_idx + 1]
+        if len(current_layer) == 0 or len(next_layer) == 0:
+            continue
+        src, dst = _layer_edges(rng, current_layer, next_layer, 2, 4)
+        add(src, dst, DOWNSTREAM)
+        if layer_idx + 2 < NUM_LAYERS and len(layers[layer_idx + 2]):
+            skip_layer = layers[layer_idx + 2]
+            skipping = dst[rng.random(len(dst)) < 0.3]
+            add(skipping, skip_layer[rng.integers(0, len(skip_layer), len(skipping))], DOWNSTREAM)
+
+    # 20% of systems get an upstream dependency on the layer above
+    for layer_idx in range(1, NUM_LAYERS):
+        current_layer, upper_layer = layers[layer_idx], layers[layer_idx - 1]
+        if len(upper_layer) == 0:
+            continue
+        src = current_layer[rng.random(len(current_layer)) < 0.2]
+        add(src, upper_layer[rng.integers(0, len(upper_layer), len(src))], UPSTREAM)
+
+    dependencies = {
+        "source": np.concatenate(sources) if sources else np.empty(0, dtype=np.int64),
+        "target": np.concatenate(targets) if targets else np.empty(0, dtype=np.int64),
+        "type": np.concatenate(types) if types else np.empty(0, dtype=np.int8),
+    }
+    return columns, dependencies
+
+
+def system_name(index):
+    """Returns the display name of the system at row `index`."""
+    return f"System {index + 1}"
+
+
+class SystemStore:
+    """Columnar per-system attributes: one array per field, categorical fields as integer codes.
+
+    Replaces a nested dict per system; `nested()` rebuilds the nested view on
+    demand (for tooltips), and per-field statistics are single array passes.
+    """
+
+    def __init__(self, columns, names=None):
+        self.columns = columns
+        size = len(next(iter(columns.values())))
+        self.names = names if names is not None else [system_name(i) for i in range(size)]
+        self._index = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = {name: i for i, name in enumerate(self.names)}
+        return self._index
+
+    def position(self, system):
+        """Returns the row of `system`, given either its name or its row."""
+        return system if isinstance(system, (int, np.integer)) else self.index[system]
+
+    def label(self, system, field):
+        """Returns the display value of one field for one system."""
+        value = self.columns[field][self.position(system)]
+        categories = CATEGORIES.get(field)
+        if categories:
+            return categories[value] if value >= 0 else UNKNOWN
+        if field == "System ID":
+            return f"SYS{value}" if isinstance(value, np.integer) else value
+        if isinstance(value, np.datetime64):
+            return UNKNOWN if np.isnat(value) else str(value)
+        return UNKNOWN if value < 0 else value
+
+    def labels(self, field):
+        """Returns the display values of `field` for every system."""
+        # Missing values are coded -1, which picks the trailing "Unknown"
+        return np.asarray(CATEGORIES[field] + [UNKNOWN], dtype=object)[self.columns[field]]
+
+    def counts(self, field):
+        """Returns the number of systems per category of `field`."""
+        categories = CATEGORIES[field]
+        codes = self.columns[field]
+        totals = dict(zip(categories, np.bincount(codes[codes >= 0], minlength=len(categories)).tolist()))
+        missing = int((codes < 0).sum())
+        if missing:
+            totals[UNKNOWN] = missing
+        return totals
+
+    def fingerprint(self):
+        """Returns a stable hash of every column and system name."""
+        digest = hashlib.sha1()
+        for field in sorted(self.columns):
+            column = self.columns[field]
+            digest.update(field.encode("utf-8"))
+            if column.dtype == object:
+                digest.update("\x00".join(map(str, column)).encode("utf-8"))
+            else:
+                digest.update(np.ascontiguousarray(column).tobytes())
+        digest.update("\x00".join(self.names).encode("utf-8"))
+        return digest.hexdigest()
+
+    def nested(self, system):
+        """Returns the nested per-system record, as shown in tooltips."""
+        i = self.position(system)
+        name = self.names[i]
+        label = lambda field: self.label(i, field)
+        return {
+            "System Identity & Classification": {
+                "System ID": label("System ID"),
+                "System Name": name,
+                "System Description": f"Description for {name}",
+                "System Status": label("System Status"),
+                "Operational Date": label("Operational Date"),
+                "Decommission Date": label("Decommission Date"),
+                "Agency Name": label("Agency Name"),
+                "Ministry Family Name": label("Ministry Family Name"),
+                "Security Classification": label("Security Classification"),
+                "Sensitivity Classification": label("Sensitivity Classification")
+            },
+            "Criticality & Risk": {
+                "System Criticality": label("System Criticality"),
+                "Computed RML": label("Computed RML"),
+                "Computed RML Date": label("Computed RML Date"),
+                "Agency Proposed RML": label("Agency Proposed RML"),
+                "RML Alignment": label("RML Alignment"),
+                "Endorsed RML": label("Endorsed RML"),
+                "RML Endorsement Date": label("RML Endorsement Date")
+            },
+            "System Resilience": {
+                "Service Availability": f"{label('Service Availability')}%",
+                "RTO": f"{label('RTO')} hours",
+                "RPO": f"{label('RPO')} hours"
+            },
+            "Dependencies": {
+                "Dependency Type": label("Dependency Type"),
+                "Dependency Status": label("Dependency Status")
+            }
+        }
+
+
+def dependency_triples(dependencies, names=None):
+    """Yields `(source, target, dependency_type)` triples using system display names."""
+    name = system_name if names is None else names.__getitem__
+    for source, target, dep_type in zip(
+        dependencies["source"].tolist(), dependencies["target"].tolist(), dependencies["type"].tolist()
+    ):
+        yield name(source), name(target), DEPENDENCY_TYPES[dep_type]
+
+
+def dependency_arrays(triples, store):
+    """Packs `(source, target, dependency_type)` name triples back into `source`/`target`/`type` arrays."""
+    triples = list(triples)
+    codes = {label: code for code, label in enumerate(DEPENDENCY_TYPES)}
+    return {
+        "source": np.array([store.position(source) for source, _, _ in triples], dtype=np.int64),
+        "target": np.array([store.position(target) for _, target, _ in triples], dtype=np.int64),
+        "type": np.array([codes[dep_type] for _, _, dep_type in triples], dtype=np.int8),
+    }
@@ -0,0 +1,225 @@
+import threading
+from contextlib import contextmanager, nullcontext
+
+import networkx as nx
+
+from impact import ConnectivityIndex, ReachabilityIndex, impact_edges
+from inventory import DEPENDENCY_TYPES, SystemStore
+from render_cache import graph_fingerprint
+
+ADD, REMOVE = "add", "remove"
+
+
+class EdgeChanges:
+    """Net effect of a batch of dependency events: the graph and failure-propagation edges gained and lost."""
+
+    def __init__(self, added, removed, impact_added, impact_removed):
+        self.added = added
+        self.removed = removed
+        self.impact_added = impact_added
+        self.impact_removed = impact_removed
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.impact_added or self.impact_removed)
+
+
+def _impact_pair(dependency):
+    return next(impact_edges([dependency]))
+
+
+class InventoryGraph:
+    """One inventory graph plus its lazily built indexes and derived results.
+
+    Instances are shared by every session. Dependency changes are applied in
+    place by `apply_changes`, which waits for code walking the graph under
+    `reading`; readers never wait for each other.
+    """
+
+    def __init__(self, store, dependencies, version=0):
+        self.store = store
+        # Insertion-ordered dict used as a set of (source, target, dependency_type) triples
+        self.dependencies = dict.fromkeys(dependencies)
+        self.version = version
+        self.graph = nx.DiGraph()
+        self.graph.add_nodes_from(store.names)
+        for source, target, dep_type in self.dependencies:
+            self.graph.add_edge(source, target, dependency_type=dep_type)
+        self.edge_count = self.graph.number_of_edges()
+        self.graph_hash = graph_fingerprint(version, store.fingerprint(), list(self.dependencies))
+        # Memo entries are (value, update); see `memoize`
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+        self._building = {}
+        # Number of change batches applied, so builds can tell whether one landed meanwhile
+        self._changes = 0
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._local = threading.local()
+
+    @contextmanager
+    def reading(self):
+        """Holds dependency changes off while the graph is read; readers do not block each other."""
+        depth = getattr(self._local, "depth", 0)
+        if not depth:
+            with self._condition:
+                while self._writing:
+                    self._condition.wait()
+                self._readers += 1
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if not depth:
+                with self._condition:
+                    self._readers -= 1
+                    self._condition.notify_all()
+
+    @contextmanager
+    def _exclusive(self):
+        with self._condition:
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+    def subgraph(self, rows):
+        """Returns a new inventory graph of the systems at `rows` and the dependencies among them."""
+        rows = list(rows)
+        names = [self.store.names[row] for row in rows]
+        store = SystemStore({field: column[rows] for field, column in self.store.columns.items()}, names=names)
+        kept = set(names)
+        with self.reading():
+            dependencies = [dependency for dependency in self.dependencies if dependency[0] in kept and dependency[1] in kept]
+        return InventoryGraph(store, dependencies, self.version)
+
+    def memoize(self, key, build, update=None):
+        """Returns the derived object stored under `key`, building it on first use.
+
+        Only callers asking for the same key wait for a build. `update(value,
+        changes)` keeps the object current when dependencies change and
+        returns `False` if it cannot; such objects are built and stored under
+        `reading`, so no change is missed. Objects without an update are
+        dropped on every change: their build takes what it needs under
+        `reading` itself, and the result is not kept if a change lands first.
+        """
+        with self._memo_lock:
+            if key in self._memo:
+                return self._memo[key][0]
+            key_lock = self._building.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._memo_lock:
+                if key in self._memo:
+                    return self._memo[key][0]
+                changes = self._changes
+            with self.reading() if update is not None else nullcontext():
+                value = build()
+                with self._memo_lock:
+                    self._building.pop(key, None)
+                    if update is not None or self._changes == changes:
+                        self._memo[key] = (value, update)
+            return value
+
+    def connectivity(self):
+        return self.memoize(
+            "connectivity",
+            lambda: ConnectivityIndex(self.graph.nodes(), self.graph.edges()),
+            self._update_connectivity,
+        )
+
+    def impact_graph(self):
+        """Returns the graph of failure-propagation edges (provider -> dependent)."""
+        def build():
+            G = nx.DiGraph()
+            G.add_nodes_from(self.graph.nodes())
+            G.add_edges_from(impact_edges(self.dependencies))
+            return G
+
+        def update(G, changes):
+            G.remove_edges_from(changes.impact_removed)
+            G.add_edges_from(changes.impact_added)
+            return True
+
+        return self.memoize("impact_graph", build, update)
+
+    def reachability(self):
+        def update(index, changes):
+            return all(index.remove_edge(*pair) for pair in changes.impact_removed) and all(
+                index.add_edge(*pair) for pair in changes.impact_added
+            )
+
+        return self.memoize(
+            "reachability", lambda: ReachabilityIndex(self.graph.nodes(), impact_edges(self.dependencies)), update
+        )
+
+    def _update_connectivity(self, index, changes):
+        G = self.graph
+        index.add_edges(changes.added)
+        # A removed edge only disconnects its systems if no edge is left between them either way
+        removed = [(source, target) for source, target in changes.removed if not G.has_edge(target, source)]
+        index.remove_edges(removed, lambda node: list(G.successors(node)) + list(G.predecessors(node)))
+        return True
+
+    def _impact_pair_present(self, provider, dependent):
+        upstream = (dependent, provider, "Upstream") in self.dependencies
+        return upstream or any(
+            (provider, dependent, dep_type) in self.dependencies for dep_type in DEPENDENCY_TYPES if dep_type != "Upstream"
+        )
+
+    def apply_changes(self, events):
+        """Applies a batch of `(operation, source, target, dependency_type)` events in place.
+
+        `operation` is "add" or "remove". The graph, the edge count and every
+        memoized object with an update are adjusted from the changed edges
+        alone, so the cost follows the size of the change rather than the
+        graph. Adding a present dependency, removing an absent one or naming
+        an unknown system changes nothing. Returns the events applied.
+        """
+        applied = []
+        with self._exclusive():
+            pairs, impact_pairs = {}, {}
+            for operation, source, target, dep_type in events:
+                dependency = (source, target, dep_type)
+                if source not in self.store or target not in self.store:
+                    continue
+                if operation not in (ADD, REMOVE) or (operation == ADD) == (dependency in self.dependencies):
+                    continue
+                impact_pair = _impact_pair(dependency)
+                pairs.setdefault((source, target), self.graph.has_edge(source, target))
+                impact_pairs.setdefault(impact_pair, self._impact_pair_present(*impact_pair))
+                if operation == ADD:
+                    self.dependencies[dependency] = None
+                    self.graph.add_edge(source, target, dependency_type=dep_type)
+                else:
+                    del self.dependencies[dependency]
+                    # Another dependency type may still link the pair, as when the graph was built
+                    remaining = [t for t in DEPENDENCY_TYPES if (source, target, t) in self.dependencies]
+                    if remaining:
+                        self.graph.add_edge(source, target, dependency_type=remaining[-1])
+                    else:
+                        self.graph.remove_edge(source, target)
+                applied.append((operation, *dependency))
+            if not applied:
+                return applied
+
+            changes = EdgeChanges(
+                [pair for pair, had in pairs.items() if not had and self.graph.has_edge(*pair)],
+                [pair for pair, had in pairs.items() if had and not self.graph.has_edge(*pair)],
+                [pair for pair, had in impact_pairs.items() if not had and self._impact_pair_present(*pair)],
+                [pair for pair, had in impact_pairs.items() if had and not self._impact_pair_present(*pair)],
+            )
+            self.edge_count += len(changes.added) - len(changes.removed)
+            self.graph_hash = graph_fingerprint(self.graph_hash, applied)
+            with self._memo_lock:
+                self._changes += 1
+                if changes:
+                    for key, (value, update) in list(self._memo.items()):
+                        if update is None or not update(value, changes):
+                            del self._memo[key]
+        return applied
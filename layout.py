@@ -0,0 +1,122 @@
+import math
+
+import networkx as nx
+import numpy as np
+
+
+def _as_digraph(nodes, edges):
+    G = nx.DiGraph()
+    G.add_nodes_from(nodes)
+    G.add_edges_from(edges)
+    return G
+
+
+def layered_layout(nodes, edges, layer_spacing=200, node_spacing=200):
+    """Returns fixed top-down positions from a topological layering of the graph.
+
+    Cycles are collapsed into their strongly connected component so every
+    node gets a layer; nodes within a layer are ordered by the mean position
+    of their parents to keep edge crossings down.
+    """
+    G = _as_digraph(nodes, edges)
+    condensed = nx.condensation(G)
+    component_of = condensed.graph["mapping"]
+
+    depth = {}
+    for component in nx.topological_sort(condensed):
+        depth[component] = max((depth[p] + 1 for p in condensed.predecessors(component)), default=0)
+
+    layers = {}
+    for node in G.nodes():
+        layers.setdefault(depth[component_of[node]], []).append(node)
+
+    order = {}
+    positions = {}
+    for level in sorted(layers):
+        def barycenter(node):
+            parents = [order[p] for p in G.predecessors(node) if p in order]
+            return sum(parents) / len(parents) if parents else math.inf
+
+        layer = sorted(layers[level], key=barycenter)
+        offset = (len(layer) - 1) / 2
+        for index, node in enumerate(layer):
+            order[node] = index - offset
+            positions[node] = (round((index - offset) * node_spacing), level * layer_spacing)
+    return positions
+
+
+def force_layout(nodes, edges, node_spacing=200, iterations=50, seed=42, max_repulsors=250):
+    """Returns fixed positions from a vectorised Fruchterman-Reingold layout.
+
+    On large graphs each node is repelled by a random sample of at most
+    `max_repulsors` nodes per iteration (reweighted to the full count), which
+    keeps every iteration linear in the number of nodes and edges.
+    """
+    G = _as_digraph(nodes, edges)
+    index = list(G.nodes())
+    n = len(index)
+    if n == 0:
+        return {}
+    position_of = {node: i for i, node in enumerate(index)}
+    pairs = np.array(
+        [(position_of[u], position_of[v]) for u, v in G.edges() if u != v], dtype=np.int64
+    ).reshape(-1, 2)
+    source, target = pairs[:, 0], pairs[:, 1]
+
+    rng = np.random.default_rng(seed)
+    pos = rng.random((n, 2)) - 0.5
+    k = 1 / math.sqrt(n)
+    temperature = 0.1
+    cooling = temperature / (iterations + 1)
+    chunk = max(1, 1_000_000 // min(n, max_repulsors))
+
+    for _ in range(iterations):
+        if n <= max_repulsors:
+            sample, weight = np.arange(n), 1.0
+        else:
+            sample, weight = rng.choice(n, max_repulsors, replace=False), n / max_repulsors
+        displacement = np.zeros((n, 2))
+
+        # Repulsion between every node and the sampled nodes, in bounded chunks
+        for start in range(0, n, chunk):
+            dx = pos[start:start + chunk, 0, None] - pos[None, sample, 0]
+            dy = pos[start:start + chunk, 1, None] - pos[None, sample, 1]
+            push = weight * k * k / np.maximum(dx * dx + dy * dy, 1e-6)
+            displacement[start:start + chunk, 0] += (dx * push).sum(axis=1)
+            displacement[start:start + chunk, 1] += (dy * push).sum(axis=1)
+
+        # Attraction along edges
+        delta = pos[source] - pos[target]
+        pull = delta * (np.sqrt((delta ** 2).sum(axis=1)) / k)[:, None]
+        np.subtract.at(displacement, source, pull)
+        np.add.at(displacement, target, pull)
+
+        length = np.maximum(np.sqrt((displacement ** 2).sum(axis=1)), 1e-9)
+        pos += displacement * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+
+    pos -= pos.mean(axis=0)
+    pos *= (node_spacing * math.sqrt(n) / 2) / max(np.abs(pos).max(), 1e-9)
+    return {node: (round(float(x)), round(float(y))) for node, (x, y) in zip(index, pos)}
+
+
+def settle_nodes(positions, G, edges, pull=1 / 3):
+    """Moves the endpoints of new `edges` part of the way towards their neighbours' centre, in place.
+
+    Keeps a force-directed layout current after a few dependency changes
+    without moving the rest of the graph.
+    """
+    for node in {node for edge in edges for node in edge}:
+        neighbours = set(G.successors(node)) | set(G.predecessors(node))
+        neighbours.discard(node)
+        if not neighbours:
+            continue
+        x, y = positions[node]
+        centre_x = sum(positions[other][0] for other in neighbours) / len(neighbours)
+        centre_y = sum(positions[other][1] for other in neighbours) / len(neighbours)
+        positions[node] = (round(x + (centre_x - x) * pull), round(y + (centre_y - y) * pull))
+
+
+def layers_hold(positions, edges):
+    """Returns `True` if every one of the new failure-propagation `edges` still points down the layers of a layered layout."""
+    return all(positions[source][1] < positions[target][1] for source, target in edges if source != target)
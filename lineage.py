@@ -0,0 +1,47 @@
+from impact import ReachabilityIndex
+
+
+class LineageIndex:
+    """Ancestor/descendant index over the field-to-field derivations of a data model.
+
+    Only edges between two field-tier entities count as derivations (e.g.
+    `Economy -> System Criticality -> Computed RML`). The transitive closure
+    is precomputed as bitsets by `ReachabilityIndex`, so asking what feeds or
+    depends on a field is a lookup rather than a graph traversal, however
+    many fields the schema declares.
+    """
+
+    def __init__(self, model):
+        fields = {name for name in model.entities if model.entity_tier(name) == "field"}
+        self.edges = [
+            (source, target) for source, target, _, _ in model.edges if source in fields and target in fields
+        ]
+        # Fields that take part in at least one derivation, in declaration order
+        linked = {field for edge in self.edges for field in edge}
+        self.fields = [name for name in model.entities if name in linked]
+        self._index = ReachabilityIndex(self.fields, self.edges)
+
+    def __contains__(self, field):
+        return field in self._index
+
+    def ancestors(self, field):
+        """Returns the fields `field` is derived from, directly or transitively."""
+        return self._index.upstream(field) if field in self._index else frozenset()
+
+    def descendants(self, field):
+        """Returns the fields derived from `field`, directly or transitively."""
+        return self._index.downstream(field) if field in self._index else frozenset()
+
+    def lineage(self, field):
+        """Returns the fields on any derivation path through `field`, and the edges among them.
+
+        An edge is on a path through `field` when both its ends are ancestors
+        (or `field` itself), or both are descendants (or `field` itself).
+        """
+        upstream = self.ancestors(field) | {field}
+        downstream = self.descendants(field) | {field}
+        edges = {
+            (source, target) for source, target in self.edges
+            if (source in upstream and target in upstream) or (source in downstream and target in downstream)
+        }
+        return upstream | downstream, edges
@@ -1,9 +1,82 @@
+import json
 import streamlit as st
-from pyvis.network import Network
-import networkx as nx
 import streamlit.components.v1 as components
-import tempfile
-import os
+from render_cache import RenderCache
+from vis_component import VENDORED_CSS, VENDORED_JS, asset_url
+from vis_render import render_html, to_json
+from layout import force_layout, layered_layout
+from data_model import SchemaError, available_versions, load_data_model
+from lineage import LineageIndex
+
+# Tiers shown before anything is expanded
+BASE_TIERS = ("module", "submodule")
+
+# Styling of a field lineage query: the path through the field stands out, everything else fades
+LINEAGE_EDGE = {"color": {"color": "#E65100", "opacity": 1.0}, "width": 3}
+FADED_OPACITY = 0.2
+
+# Client-side level of detail: clicking a node reveals or hides its children from the
+# precomputed detail map, applying only the added/removed nodes and edges to the network
+LEVEL_OF_DETAIL_SCRIPT = """
+<script>
+    var detail = {detail};
+    var expanded = new Set();
+    try {{
+        expanded = new Set(JSON.parse(sessionStorage.getItem(detail.key) || "[]"));
+    }} catch (e) {{}}
+
+    function visibleNodes() {{
+        var visible = new Set(detail.base);
+        var stack = detail.base.filter(function (id) {{ return expanded.has(id); }});
+        while (stack.length) {{
+            (detail.children[stack.pop()] || []).forEach(function (child) {{
+                if (!visible.has(child)) {{
+                    visible.add(child);
+                    if (expanded.has(child)) stack.push(child);
+                }}
+            }});
+        }}
+        return visible;
+    }}
+
+    // A child already shown through another parent is not counted as hidden
+    function labelled(id, visible) {{
+        var hidden = (detail.children[id] || []).filter(function (child) {{ return !visible.has(child); }}).length;
+        var node = Object.assign({{}}, detail.nodes[id]);
+        if (hidden) node.label += " (+" + hidden + ")";
+        return node;
+    }}
+
+    function refresh() {{
+        var visible = visibleNodes();
+        var shown = new Set(nodes.getIds());
+        nodes.remove(Array.from(shown).filter(function (id) {{ return !visible.has(id); }}));
+        var label = function (id) {{ return labelled(id, visible); }};
+        nodes.add(Array.from(visible).filter(function (id) {{ return !shown.has(id); }}).map(label));
+        // Revealing or hiding children changes the hidden count of every parent they share
+        nodes.update(Array.from(visible).filter(function (id) {{
+            return shown.has(id) && nodes.get(id).label !== label(id).label;
+        }}).map(label));
+
+        var wanted = detail.edges.filter(function (e) {{ return visible.has(e.from) && visible.has(e.to); }});
+        var wantedIds = new Set(wanted.map(function (e) {{ return e.id; }}));
+        var drawn = new Set(edges.getIds());
+        edges.remove(Array.from(drawn).filter(function (id) {{ return !wantedIds.has(id); }}));
+        edges.add(wanted.filter(function (e) {{ return !drawn.has(e.id); }}));
+        try {{
+            sessionStorage.setItem(detail.key, JSON.stringify(Array.from(expanded)));
+        }} catch (e) {{}}
+    }}
+
+    network.on("click", function (params) {{
+        var id = params.nodes.length === 1 ? params.nodes[0] : null;
+        if (id === null || !(detail.children[id] || []).length) return;
+        if (expanded.has(id)) expanded.delete(id); else expanded.add(id);
+        refresh();
+    }});
+    refresh();
+</script>
+"""
 
 def check_password():
     """Returns `True` if the user had the correct password."""
@@ -30,653 +103,100 @@ def check_password():
     else:
         return True
 
-if check_password():
-    st.set_page_config(page_title="Interactive Interdependency Graph", layout="wide")
-    st.title("⚙️ Data Model : System Management and Agency Management V2.3)")
-
-    # Add the view toggle
-    view_type = st.toggle("Enable Hierarchical Layout", False)
-
-    # Define standardised settings
-    NODE_SETTINGS = {
-        "module": {
-            "size": 50,
-            "shape": "dot"
-        },
-        "submodule": {
-            "size": 35,
-            "shape": "dot"
-        },
-        "subgroup": {
-            "size": 25,
-            "shape": "dot"
-        },
-        "field": {
-            "size": 15,
-            "shape": "dot"
-        }
-    }
 
+@st.cache_data(max_entries=16)
+def compute_layout(graph_hash, hierarchical, _nodes, _edges):
+    """Returns fixed node positions, computed once per graph version and layout mode."""
+    if hierarchical:
+        return layered_layout(_nodes, _edges)
+    return force_layout(_nodes, _edges)
 
 
+@st.cache_data(max_entries=4)
+def build_detail_map(graph_hash, _model):
+    """Returns, per node, the children revealed when it is expanded, and the nodes visible from the start."""
+    children = {}
+    for source, target, _, _ in _model.edges:
+        children.setdefault(source, []).append(target)
+    # Nodes without a parent could never be revealed, so they are shown from the start too
+    revealed = {target for targets in children.values() for target in targets}
+    base = [node for node in _model.entities if _model.entity_tier(node) in BASE_TIERS or node not in revealed]
+    return children, base
 
-    COLOR_SCHEMES = {
-        "system_management": {
-            "module": "#1B5E20",      # Darkest green
-            "submodule": "#2E7D32",   # Dark green
-            "subgroup": "#388E3C",    # Medium green
-            "field": "#43A047"        # Light green
-        },
-        "agency_management": {
-            "module": "#1A237E",      # Darkest blue
-            "submodule": "#283593",   # Dark blue
-            "subgroup": "#303F9F",    # Medium blue
-            "field": "#3949AB"        # Light blue
-        }
-    }
-
-    # Complete entities dictionary with all nodes
-    entities = {
-        # Root node
-        "DGP 2.0": {
-            "color": "#808080",  # Grey color
-            "size": 80,  # Larger than module size
-            "shape": NODE_SETTINGS["module"]["shape"],
-            "title": "DGP 2.0 Root"
-        },
-
-        # System Management Module and related nodes
-        "System Management": {
-            "color": COLOR_SCHEMES["system_management"]["module"],
-            "size": NODE_SETTINGS["module"]["size"],
-            "shape": NODE_SETTINGS["module"]["shape"],
-            "title": "System Management Module"
-        },
-        "System Identity & Classification": {
-            "color": COLOR_SCHEMES["system_management"]["submodule"],
-            "size": NODE_SETTINGS["submodule"]["size"],
-            "shape": NODE_SETTINGS["submodule"]["shape"],
-            "title": "System Identity & Classification Sub-Module"
-        },
-        "Criticality & Risk": {
-            "color": COLOR_SCHEMES["system_management"]["submodule"],
-            "size": NODE_SETTINGS["submodule"]["size"],
-            "shape": NODE_SETTINGS["submodule"]["shape"],
-            "title": "Criticality & Risk Sub-Module"
-        },
-        "System Resilience": {
-            "color": COLOR_SCHEMES["system_management"]["submodule"],
-            "size": NODE_SETTINGS["submodule"]["size"],
-            "shape": NODE_SETTINGS["submodule"]["shape"],
-            "title": "System Resilience Sub-Module"
-        },
-        "Hosting and System Dependencies": {
-            "color": COLOR_SCHEMES["system_management"]["submodule"],
-            "size": NODE_SETTINGS["submodule"]["size"],
-            "shape": NODE_SETTINGS["submodule"]["shape"],
-            "title": "Hosting and System Dependencies Sub-Module"
-        },
-
-        # Agency Management Module and related nodes
-        "Agency Management": {
-            "color": COLOR_SCHEMES["agency_management"]["module"],
-            "size": NODE_SETTINGS["module"]["size"],
-            "shape": NODE_SETTINGS["module"]["shape"],
-            "title": "Agency Management Module"
-        },
-
-
-
-
-            # Agency Management submodules
-        "Agency": {
-            "color": COLOR_SCHEMES["agency_management"]["submodule"],
-            "size": NODE_SETTINGS["submodule"]["size"],
-            "shape": NODE_SETTINGS["submodule"]["shape"],
-            "title": "Agency Sub-Module"
-        },
-        "Key Appointment Holder": {
-            "color": COLOR_SCHEMES["agency_management"]["submodule"],
-            "size": NODE_SETTINGS["submodule"]["size"],
-            "shape": NODE_SETTINGS["submodule"]["shape"],
-            "title": "Key Appointment Holder Sub-Module"
-        },
-
-        # System Management Subgroups
-        "Basic Information": {
-            "color": COLOR_SCHEMES["system_management"]["subgroup"],
-            "size": NODE_SETTINGS["subgroup"]["size"],
-            "shape": NODE_SETTINGS["subgroup"]["shape"],
-            "title": "Basic Information Sub-Group"
-        },
-        "Organizational Context": {
-            "color": COLOR_SCHEMES["system_management"]["subgroup"],
-            "size": NODE_SETTINGS["subgroup"]["size"],
-            "shape": NODE_SETTINGS["subgroup"]["shape"],
-            "title": "Organizational Context Sub-Group"
-        },
-        "Classification": {
-            "color": COLOR_SCHEMES["system_management"]["subgroup"],
-            "size": NODE_SETTINGS["subgroup"]["size"],
-            "shape": NODE_SETTINGS["subgroup"]["shape"],
-            "title": "Classification Sub-Group"
-        },
-        "Impact Assessment": {
-            "color": COLOR_SCHEMES["system_management"]["subgroup"],
-            "size": NODE_SETTINGS["subgroup"]["size"],
-            "shape": NODE_SETTINGS["subgroup"]["shape"],
-            "title": "Impact Assessment Sub-Group"
-        },
-        "Risk Materiality Level": {
-            "color": COLOR_SCHEMES["system_management"]["subgroup"],
-            "size": NODE_SETTINGS["subgroup"]["size"],
-            "shape": NODE_SETTINGS["subgroup"]["shape"],
-            "title": "Risk Materiality Level Sub-Group"
-        },
-        "SCA/RML Approval": {
-            "color": COLOR_SCHEMES["system_management"]["subgroup"],
-            "size": NODE_SETTINGS["subgroup"]["size"],
-            "shape": NODE_SETTINGS["subgroup"]["shape"],
-            "title": "SCA/RML Approval Sub-Group"
-        },
-        "Availability & Recovery": {
-            "color": COLOR_SCHEMES["system_management"]["subgroup"],
-            "size": NODE_SETTINGS["subgroup"]["size"],
-            "shape": NODE_SETTINGS["subgroup"]["shape"],
-            "title": "Availability & Recovery Sub-Group"
-        },
-        "Dependencies Management": {
-            "color": COLOR_SCHEMES["system_management"]["subgroup"],
-            "size": NODE_SETTINGS["subgroup"]["size"],
-            "shape": NODE_SETTINGS["subgroup"]["shape"],
-            "title": "Dependencies Management Sub-Group"
-        },
-
-
-
-
-            # System Management Fields - Basic Information
-        "System ID": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "System ID field"
-        },
-        "System Name": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "System Name field"
-        },
-        "System Description": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "System Description field"
-        },
-        "System Status": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "System Status field"
-        },
-        "Operational Date": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Operational Date field"
-        },
-        "Decommission Date": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Decommission Date field"
-        },
-
-        # System Management Fields - Classification
-        "Security Classification": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Security Classification field"
-        },
-        "Sensitivity Classification": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Sensitivity Classification field"
-        },
-
-        # System Management Fields - Impact Assessment
-        "Economy": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Economy field"
-        },
-        "Public Health and Safety": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Public Health and Safety field"
-        },
-        "National Security": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "National Security field"
-        },
-        "Social Preparedness": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Social Preparedness field"
-        },
-        "Public Service": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Public Service field"
-        },
-
-
-
-
-            # System Management Fields - Risk Materiality Level
-        "System Criticality": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "System Criticality field"
-        },
-        "Designated CII": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Designated CII field"
-        },
-        "Computed RML": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Computed RML field"
-        },
-        "Computed RML Date": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Computed RML Date field"
-        },
-        "Agency Proposed RML": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Agency Proposed RML field"
-        },
-        "RML Alignment": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "RML Alignment field"
-        },
-        "RML Justification": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "RML Justification field"
-        },
-        "Endorsed RML": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Endorsed RML field"
-        },
-        "RML Endorsement Date": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "RML Endorsement Date field"
-        },
-        "Endorsement Comments": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Endorsement Comments field"
-        },
-        "IDSC Approval Date": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "IDSC Approval Date field"
-        },
-        "IDSC Approval Attachment": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "IDSC Approval Attachment field"
-        },
-        "MHA Approval": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "MHA Approval field"
-        },
-        "CSA Approval": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "CSA Approval field"
-        },
-        "SNDGO Approval": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "SNDGO Approval field"
-        },
-
-
-
-
-            # System Management Fields - Additional Approval Fields
-        "MHA Comments": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "MHA Comments field"
-        },
-        "CSA Comments": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "CSA Comments field"
-        },
-        "SNDGO Comments": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "SNDGO Comments field"
-        },
-
-        # System Management Fields - System Resilience
-        "Service Availability": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Service Availability field"
-        },
-        "RECOVERY TIME OBJECTIVE": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "RECOVERY TIME OBJECTIVE field"
-        },
-        "RECOVERY POINT OBJECTIVE": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "RECOVERY POINT OBJECTIVE field"
-        },
-
-        # System Management Fields - Dependencies
-        "Dependency ID": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Dependency ID field"
-        },
-        "Dependency Status": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Dependency Status field"
-        },
-        "Dependency Type": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Dependency Type field"
-        },
-        "Dependent System": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Dependent System field"
-        },
-        "Downstream Dependency": {
-            "color": COLOR_SCHEMES["system_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Downstream Dependency field"
-        },
-
-
-
-
-            # Agency Management Fields
-        "Agency Name": {
-            "color": COLOR_SCHEMES["agency_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Agency Name field"
-        },
-        "Agency Abbreviation (Short Form)": {
-            "color": COLOR_SCHEMES["agency_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Agency Abbreviation field"
-        },
-        "Agency Operational Status": {
-            "color": COLOR_SCHEMES["agency_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Agency Operational Status field"
-        },
-        "Ministry Family": {
-            "color": COLOR_SCHEMES["agency_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Ministry Family field"
-        },
-        "Full Name": {
-            "color": COLOR_SCHEMES["agency_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Full Name field"
-        },
-        "Designation": {
-            "color": COLOR_SCHEMES["agency_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Designation field"
-        },
-        "Email": {
-            "color": COLOR_SCHEMES["agency_management"]["field"],
-            "size": NODE_SETTINGS["field"]["size"],
-            "shape": NODE_SETTINGS["field"]["shape"],
-            "title": "Email field"
-        }
-    }
 
-    # Complete edges list
-    edges = [
-        # Root node connections
-        ("DGP 2.0", "System Management", "", ""),
-        ("DGP 2.0", "Agency Management", "", ""),
-
-        # System Management Module relationships
-        ("System Management", "System Identity & Classification", "", ""),
-        ("System Management", "Criticality & Risk", "", ""),
-        ("System Management", "System Resilience", "", ""),
-        ("System Management", "Hosting and System Dependencies", "", ""),
-
-        # System Identity & Classification relationships
-        ("System Identity & Classification", "Basic Information", "", ""),
-        ("System Identity & Classification", "Organizational Context", "", ""),
-        ("System Identity & Classification", "Classification", "", ""),
-
-        # Basic Information field connections
-        ("Basic Information", "System ID", "", ""),
-        ("Basic Information", "System Name", "", ""),
-        ("Basic Information", "System Description", "", ""),
-        ("Basic Information", "System Status", "", ""),
-        ("Basic Information", "Operational Date", "", ""),
-        ("Basic Information", "Decommission Date", "", ""),
-
-
-
-
-            # Organizational Context field connections
-        ("Organizational Context", "Agency Name", "", ""),
-
-        # Classification field connections
-        ("Classification", "Security Classification", "", ""),
-        ("Classification", "Sensitivity Classification", "", ""),
-
-        # Criticality & Risk relationships
-        ("Criticality & Risk", "Impact Assessment", "", ""),
-        ("Criticality & Risk", "Risk Materiality Level", "", ""),
-        ("Criticality & Risk", "SCA/RML Approval", "", ""),
-
-        # Impact Assessment field connections
-        ("Impact Assessment", "Economy", "", ""),
-        ("Impact Assessment", "Public Health and Safety", "", ""),
-        ("Impact Assessment", "National Security", "", ""),
-        ("Impact Assessment", "Social Preparedness", "", ""),
-        ("Impact Assessment", "Public Service", "", ""),
-        ("Impact Assessment", "Designated CII", "", ""),
-        ("Economy", "System Criticality", "", ""),
-        ("Public Health and Safety", "System Criticality", "", ""),
-        ("National Security", "System Criticality", "", ""),
-        ("Social Preparedness", "System Criticality", "", ""),
-        ("Public Service", "System Criticality", "", ""),
-        ("Designated CII", "System Criticality", "", ""),
-
-
-
-        # Risk Materiality Level field connections
-        ("Risk Materiality Level", "Computed RML", "", ""),
-        ("Risk Materiality Level", "Computed RML Date", "", ""),
-        ("Risk Materiality Level", "Agency Proposed RML", "", ""),
-        ("Risk Materiality Level", "RML Alignment", "", ""),
-        ("Risk Materiality Level", "RML Justification", "", ""),
-
-
-        # SCA/RML Approval field connections
-        ("SCA/RML Approval", "Endorsed RML", "", ""),
-        ("SCA/RML Approval", "RML Endorsement Date", "", ""),
-        ("SCA/RML Approval", "Endorsement Comments", "", ""),
-        ("SCA/RML Approval", "IDSC Approval Date", "", ""),
-        ("SCA/RML Approval", "IDSC Approval Attachment", "", ""),
-        ("SCA/RML Approval", "MHA Approval", "", ""),
-        ("SCA/RML Approval", "CSA Approval", "", ""),
-        ("SCA/RML Approval", "SNDGO Approval", "", ""),
-        ("SCA/RML Approval", "MHA Comments", "", ""),
-        ("SCA/RML Approval", "CSA Comments", "", ""),
-        ("SCA/RML Approval", "SNDGO Comments", "", ""),
-
-        # System Resilience relationships
-        ("System Resilience", "Availability & Recovery", "", ""),
-
-        # Availability & Recovery field connections
-        ("Availability & Recovery", "Service Availability", "", ""),
-        ("Availability & Recovery", "RECOVERY TIME OBJECTIVE", "", ""),
-        ("Availability & Recovery", "RECOVERY POINT OBJECTIVE", "", ""),
-
-
-
-
-            # Hosting and System Dependencies relationships
-        ("Hosting and System Dependencies", "Dependencies Management", "", ""),
-
-        # Dependencies Management field connections
-        ("Dependencies Management", "Dependency ID", "", ""),
-        ("Dependencies Management", "Dependency Status", "", ""),
-        ("Dependencies Management", "Dependency Type", "", ""),
-        ("Dependencies Management", "Dependent System", "", ""),
-        ("Downstream Dependency", "Dependency ID", "", ""),
-        ("Downstream Dependency", "Dependency Status", "", ""),
-        ("Downstream Dependency", "Dependency Type", "", ""),
-        ("Downstream Dependency", "Dependent System", "", ""),
-        ("Downstream Dependency", "Computed RML", "", ""),
-
-        # Agency Management Module relationships
-        ("Agency Management", "Agency", "", ""),
-        ("Agency Management", "Key Appointment Holder", "", ""),
-
-        # Agency field connections
-        ("Agency", "Agency Name", "", ""),
-        ("Agency", "Agency Abbreviation (Short Form)", "", ""),
-        ("Agency", "Agency Operational Status", "", ""),
-        ("Agency", "Ministry Family", "", ""),
-
-        # Key Appointment Holder field connections
-        ("Key Appointment Holder", "Full Name", "", ""),
-        ("Key Appointment Holder", "Designation", "", ""),
-        ("Key Appointment Holder", "Email", "", ""),
-
-        # Cross-module relationships
-        ("System Criticality", "Computed RML", "", ""),
-        ("Security Classification", "Computed RML", "", ""),
-        ("Sensitivity Classification", "Computed RML", "", ""),
+@st.cache_resource
+def get_render_cache():
+    """Returns the process-wide LRU cache of rendered graph HTML."""
+    return RenderCache(max_entries=32)
 
-    ]
 
-    # Create NetworkX graph
-    G = nx.DiGraph()
-    for node, attributes in entities.items():
-        node_attrs = {
-            "color": attributes["color"],
-            "size": attributes["size"],
-            "shape": attributes["shape"],
-            "title": attributes["title"],
-            "label": node
-        }
-        G.add_node(node, **node_attrs)
+@st.cache_resource
+def get_data_model(version):
+    """Returns the compiled data model for `version`, loaded once per process."""
+    return load_data_model(version)
 
 
+@st.cache_resource
+def get_lineage_index(version):
+    """Returns the field lineage index of a data model version, built once per process."""
+    return LineageIndex(get_data_model(version))
 
 
-    # Add edges
-    for source, target, label, direction in edges:
-        G.add_edge(source, target, title=label, label=label, arrows=direction)
+def build_graph_html(model, view_type, level_of_detail=False, lineage=None):
+    """Renders the data model graph to a standalone HTML page with precomputed positions.
 
-    # Create PyVis network
-    net = Network(height="900px", width="100%", directed=True)
-    net.from_nx(G)
+    With `level_of_detail`, the page starts with module and submodule nodes
+    only and expands a node's children in the browser when it is clicked.
+    `lineage` is a `(field, fields, edges)` result of a lineage query to
+    highlight; those fields are visible from the start.
+    """
+    # Serialise entities and edges straight into vis-network nodes and edges. Styling comes from
+    # the groups, shipped once under short ids, and empty edge attributes are left out
+    entities, edges, graph_hash = model.entities, model.edges, model.graph_hash
+    group_ids = {group: f"g{i}" for i, group in enumerate(model.groups)}
+    nodes = [
+        {"id": node, "label": node, "group": group_ids[attributes["group"]], "title": attributes["title"]}
+        for node, attributes in entities.items()
+    ]
+    vis_edges = []
+    for i, (source, target, label, direction) in enumerate(edges):
+        vis_edge = {"id": f"e{i}", "from": source, "to": target}
+        if label:
+            vis_edge["title"] = vis_edge["label"] = label
+        if direction:
+            vis_edge["arrows"] = direction
+        vis_edges.append(vis_edge)
+
+    if lineage is not None:
+        field, lineage_fields, lineage_edges = lineage
+        for node in nodes:
+            if node["id"] == field:
+                node["borderWidth"] = 5
+            elif node["id"] not in lineage_fields:
+                node["opacity"] = FADED_OPACITY
+        for vis_edge in vis_edges:
+            if (vis_edge["from"], vis_edge["to"]) in lineage_edges:
+                vis_edge.update(LINEAGE_EDGE)
+            else:
+                vis_edge["color"] = {"opacity": FADED_OPACITY}
+
+    # Place nodes server-side so the browser does not run the physics simulation
+    positions = compute_layout(
+        graph_hash, bool(view_type), list(entities), [(source, target) for source, target, _, _ in edges]
+    )
+    for node in nodes:
+        node["x"], node["y"] = positions[node["id"]]
 
     # Set hierarchical layout options based on toggle
     if view_type:
-        net.set_options("""{
+        options = """{
             "layout": {
                 "hierarchical": {
-                    "enabled": true,
-                    "direction": "UD",
-                    "sortMethod": "directed",
-                    "nodeSpacing": 200,
-                    "levelSeparation": 200,
-                    "treeSpacing": 200,
-                    "blockShifting": false,
-                    "edgeMinimization": false,
-                    "parentCentralization": false,
-                    "shakeTowards": "roots"
+                    "enabled": false
                 }
             },
             "physics": {
-                "enabled": true,
-                "hierarchicalRepulsion": {
-                    "centralGravity": 0.5,
-                    "springLength": 150,
-                    "springConstant": 0.3,
-                    "nodeDistance": 200,
-                    "damping": 0.09,
-                    "avoidOverlap": 1
-                },
-                "stabilization": {
-                    "enabled": true,
-                    "iterations": 2000,
-                    "updateInterval": 100,
-                    "fit": true
-                }
+                "enabled": false
             },
             "edges": {
                 "smooth": {
@@ -705,28 +225,17 @@ if check_password():
                 "dragNodes": true,
                 "dragView": true,
                 "zoomView": true
-            },
-            "groups": {
-                "useDefaultGroups": false
             }
-        }""")
+        }"""
     else:
-        net.set_options("""{
+        options = """{
             "layout": {
                 "hierarchical": {
                     "enabled": false
                 }
             },
             "physics": {
-                "enabled": true,
-                "barnesHut": {
-                    "gravitationalConstant": -60000,
-                    "centralGravity": 0.1,
-                    "springLength": 200,
-                    "springConstant": 0.08,
-                    "damping": 0.12,
-                    "avoidOverlap": 1
-                }
+                "enabled": false
             },
             "edges": {
                 "smooth": {
@@ -739,61 +248,70 @@ if check_password():
                     "opacity": 0.8
                 }
             }
-        }""")
+        }"""
+
+    options = json.loads(options)
+    options["groups"] = {"useDefaultGroups": False}
+    options["groups"].update((group_ids[group], dict(style)) for group, style in model.groups.items())
+
+    # Load the self-hosted vis-network bundle so the page carries only graph data and works offline
+    assets = {"js_url": asset_url(VENDORED_JS), "css_url": asset_url(VENDORED_CSS)}
+    if not level_of_detail:
+        return render_html(nodes, vis_edges, options, height="900px", fullscreen=True, **assets)
+
+    # Ship every node once in the detail map; the network itself starts empty and is filled from it
+    children, base = build_detail_map(graph_hash, model)
+    if lineage is not None:
+        base = base + [field for field in lineage[1] if field not in base]
+    detail = {
+        "key": f"expanded:{graph_hash}",
+        "nodes": {node["id"]: node for node in nodes},
+        "edges": vis_edges,
+        "children": children,
+        "base": base
+    }
+    script = LEVEL_OF_DETAIL_SCRIPT.format(detail=to_json(detail))
+    return render_html([], [], options, height="900px", fullscreen=True, extra_html=script, **assets)
 
-    # Save and display the network
+
+if check_password():
+    st.set_page_config(page_title="Interactive Interdependency Graph", layout="wide")
+    versions = available_versions()
+    version = st.selectbox("Data model version", versions[::-1])
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.html') as tmp_file:
-            net.save_graph(tmp_file.name)
-            with open(tmp_file.name, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-
-            fullscreen_html = """
-            <button 
-                style="
-                    position: fixed;
-                    top: 20px;
-                    right: 20px;
-                    z-index: 10000;
-                    padding: 8px 16px;
-                    background-color: #4CAF50;
-                    color: white;
-                    border: none;
-                    border-radius: 4px;
-                    cursor: pointer;
-                    font-family: Arial, sans-serif;
-                    font-size: 14px;
-                "
-                onclick="toggleFullscreen()"
-            >
-                Full Screen
-            </button>
-            <script>
-                function toggleFullscreen() {
-                    let elem = document.documentElement;
-                    if (!document.fullscreenElement) {
-                        if (elem.requestFullscreen) {
-                            elem.requestFullscreen();
-                        } else if (elem.webkitRequestFullscreen) {
-                            elem.webkitRequestFullscreen();
-                        } else if (elem.msRequestFullscreen) {
-                            elem.msRequestFullscreen();
-                        }
-                    } else {
-                        if (document.exitFullscreen) {
-                            document.exitFullscreen();
-                        } else if (document.webkitExitFullscreen) {
-                            document.webkitExitFullscreen();
-                        } else if (document.msExitFullscreen) {
-                            document.msExitFullscreen();
-                        }
-                    }
-                }
-            </script>
-            """
+        model = get_data_model(version)
+    except SchemaError as e:
+        st.error(f"Data model {version} could not be loaded: {e}")
+        st.stop()
+    st.title(f"⚙️ {model.title} {model.version}")
+    if model.warnings:
+        with st.expander(f"Schema warnings ({len(model.warnings)})"):
+            for warning in model.warnings:
+                st.write(warning)
+
+    # Field lineage: what a field is derived from and what is derived from it
+    lineage_index = get_lineage_index(version)
+    with st.sidebar:
+        st.header("Field lineage")
+        lineage_field = st.selectbox("Field", lineage_index.fields, index=None, placeholder="Choose a field")
+        lineage = None
+        if lineage_field is not None:
+            ancestors = lineage_index.ancestors(lineage_field)
+            descendants = lineage_index.descendants(lineage_field)
+            lineage = (lineage_field, *lineage_index.lineage(lineage_field))
+            st.write(f"**Fed by** ({len(ancestors)}): " + (", ".join(sorted(ancestors)) or "none"))
+            st.write(f"**Affects** ({len(descendants)}): " + (", ".join(sorted(descendants)) or "none"))
+
+    # Add the view toggle
+    view_type = st.toggle("Enable Hierarchical Layout", False)
+    level_of_detail = st.toggle("Level of detail (click a node to expand it)", True)
 
-            modified_html = html_content.replace('</body>', f'{fullscreen_html}</body>')
-            components.html(modified_html, height=900)
-            os.unlink(tmp_file.name)
+    # Display the network, rendering it only when the graph or layout changed
+    try:
+        html_content = get_render_cache().get_or_render(
+            (model.graph_hash, bool(view_type), level_of_detail, lineage_field),
+            lambda: build_graph_html(model, view_type, level_of_detail, lineage)
+        )
+        components.html(html_content, height=900)
     except Exception as e:
         st.error(f"An error occurred while generating the graph: {str(e)}")
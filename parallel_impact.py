@@ -0,0 +1,129 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from impact import propagate, spread_matrix
+from inventory import HIGH, SYSTEM_CRITICALITY
+
+BLOCK_SIZE = 2048
+# Weight of a reached system in the weighted impact, per System Criticality
+CRITICALITY_WEIGHTS = {"High": 3, "SII": 2, "Others": 1}
+# Below this many systems starting the workers costs more than the walks they would share
+MIN_PARALLEL_SYSTEMS = 20_000
+
+# Per-worker view of the shared graph, set up once by `_attach`
+_worker = {}
+
+
+class SharedGraph:
+    """The CSR failure-propagation adjacency and per-system weights in one shared-memory block.
+
+    Workers map the block read-only by name, so each task only carries a
+    range of source rows instead of a pickled graph. The edge values are all
+    ones and are recreated in each worker rather than shared.
+    """
+
+    def __init__(self, spread, weights):
+        arrays = {"indptr": spread.indptr, "indices": spread.indices, "weights": np.ascontiguousarray(weights)}
+        self.size = spread.shape[0]
+        self.layout = []
+        offset = 0
+        for name, array in arrays.items():
+            self.layout.append((name, array.dtype.str, array.shape, offset))
+            # Keep every array 8-byte aligned inside the block
+            offset += -(-array.nbytes // 8) * 8
+        self._memory = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for (_, _, _, start), array in zip(self.layout, arrays.values()):
+            np.ndarray(array.shape, array.dtype, buffer=self._memory.buf, offset=start)[...] = array
+        self.name = self._memory.name
+
+    def close(self):
+        self._memory.close()
+        self._memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _attach(name, layout, size):
+    memory = shared_memory.SharedMemory(name=name)
+    arrays = {
+        key: np.ndarray(shape, np.dtype(dtype), buffer=memory.buf, offset=offset)
+        for key, dtype, shape, offset in layout
+    }
+    data = np.ones(len(arrays["indices"]), dtype=np.float32)
+    _worker["memory"] = memory
+    _worker["spread"] = sp.csr_matrix((data, arrays["indices"], arrays["indptr"]), shape=(size, size), copy=False)
+    _worker["weights"] = arrays["weights"]
+
+
+def _impact_block(sources):
+    return propagate(_worker["spread"], sources, _worker["weights"])
+
+
+def criticality_weights(store):
+    """Returns every system's `CRITICALITY_WEIGHTS` weight, 0 where its criticality is unknown."""
+    table = np.array([CRITICALITY_WEIGHTS[label] for label in SYSTEM_CRITICALITY] + [0], dtype=np.float64)
+    return table[store.columns["System Criticality"]]
+
+
+def impact_chunks(store, dependencies, weights=None, rows=None, processes=None, block_size=BLOCK_SIZE):
+    """Computes downstream impact analytics for every system (or only `rows`), yielding a table per block.
+
+    `dependencies` holds the inventory's `source`/`target`/`type` row arrays.
+    For each system: how many systems break if it fails, how many of those
+    are High criticality, its impact depth (hops to the farthest system
+    reached) and the summed `weights` of the systems reached. Blocks of
+    source systems are spread over `processes` workers (every core by
+    default), which share the graph through a `SharedGraph`; small
+    inventories and single-core machines run in-process. Tables are yielded
+    in source order as soon as their block is done.
+    """
+    n = len(store)
+    spread = spread_matrix(n, dependencies)
+    criticality = store.columns["System Criticality"]
+    weights = np.ones(n) if weights is None else np.asarray(weights, dtype=np.float64)
+    # Reached systems are summed once against both weight columns
+    columns = np.column_stack([weights, criticality == HIGH]).astype(np.float64)
+
+    sources = np.arange(n) if rows is None else np.asarray(rows, dtype=np.int64)
+    blocks = [sources[start:start + block_size] for start in range(0, len(sources), block_size)]
+    processes = min(processes or os.cpu_count() or 1, len(blocks))
+    if processes <= 1 or len(sources) < MIN_PARALLEL_SYSTEMS:
+        for block in blocks:
+            yield _block_table(store, block, *propagate(spread, block, columns))
+    else:
+        # Spawned rather than forked workers: the app process runs server threads
+        context = multiprocessing.get_context("spawn")
+        with SharedGraph(spread, columns) as shared, ProcessPoolExecutor(
+            processes, mp_context=context, initializer=_attach, initargs=(shared.name, shared.layout, shared.size)
+        ) as pool:
+            for block, result in zip(blocks, pool.map(_impact_block, blocks)):
+                yield _block_table(store, block, *result)
+
+
+def impact_table(store, dependencies, weights=None, rows=None, processes=None, block_size=BLOCK_SIZE):
+    """Returns the `impact_chunks` analytics of every system (or only `rows`) as one table."""
+    chunks = list(impact_chunks(store, dependencies, weights, rows, processes, block_size))
+    if not chunks:
+        return _block_table(store, np.empty(0, np.int64), np.empty(0, np.int64), np.empty((0, 2)), np.empty(0, np.int64))
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _block_table(store, sources, counts, weighted, depth):
+    return pd.DataFrame({
+        "System": [store.names[row] for row in sources.tolist()],
+        "Criticality": pd.Categorical.from_codes(store.columns["System Criticality"][sources], SYSTEM_CRITICALITY),
+        "Downstream Systems": counts,
+        "High Criticality Reached": weighted[:, 1].round().astype(np.int64),
+        "Impact Depth": depth,
+        "Weighted Impact": weighted[:, 0],
+    })
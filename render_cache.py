@@ -0,0 +1,47 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def graph_fingerprint(*parts):
+    """Returns a stable hash of JSON-serialisable graph data (nodes, attributes, edges)."""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """Bounded LRU cache of finished graph HTML, shared across sessions."""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, html):
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_render(self, key, render):
+        """Returns the cached HTML for `key`, calling `render()` only on a miss."""
+        html = self.get(key)
+        if html is None:
+            html = render()
+            self.put(key, html)
+        return html
@@ -0,0 +1,164 @@
+import os
+import threading
+
+import streamlit as st
+
+from dependency_feed import DependencyFeed
+from ingest import ingest_inventory
+from filters import FILTER_COLUMNS
+from inventory import SystemStore, dependency_arrays, dependency_triples, generate_inventory
+from inventory_graph import InventoryGraph
+from search import SEARCH_COLUMNS, SearchIndex, store_search_index
+from sqlite_store import SqliteStore
+
+# Location of the persistent inventory store
+INVENTORY_DB = os.environ.get("INVENTORY_DB", "inventory.db")
+
+
+def _search_index_path(path):
+    # The saved search index sits next to the store it was built from
+    return f"{path}.search.npz"
+
+
+class DataVersions:
+    """Process-wide version counters; bumping one invalidates every cached graph built from it."""
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        return self._versions.get(name, 0)
+
+    def bump(self, name):
+        with self._lock:
+            self._versions[name] = self.get(name) + 1
+            return self._versions[name]
+
+
+@st.cache_resource
+def get_data_versions():
+    """Returns the version counters shared by every session."""
+    return DataVersions()
+
+
+@st.cache_resource(max_entries=4)
+def _synthetic_inventory(num_systems, seed, version):
+    columns, dependencies = generate_inventory(num_systems, seed=seed)
+    return InventoryGraph(SystemStore(columns), dependency_triples(dependencies), version)
+
+
+def load_synthetic_inventory(num_systems, seed):
+    """Returns the shared synthetic inventory graph for the current data version."""
+    return _synthetic_inventory(num_systems, seed, get_data_versions().get("inventory"))
+
+
+@st.cache_resource(max_entries=4)
+def _ingested_inventory(upload_ids, _systems_file, _dependencies_file, version):
+    # Keyed on the upload ids so large files are not rehashed on every rerun
+    store, dependencies, reports = ingest_inventory(_systems_file, _dependencies_file)
+    return InventoryGraph(store, dependency_triples(dependencies, store.names), version), reports
+
+
+def load_ingested_inventory(systems_file, dependencies_file=None):
+    """Returns the shared inventory graph and ingestion reports for uploaded inventory exports."""
+    upload_ids = (systems_file.file_id, getattr(dependencies_file, "file_id", None))
+    return _ingested_inventory(upload_ids, systems_file, dependencies_file, get_data_versions().get("inventory"))
+
+
+def invalidate_inventory():
+    """Forces every session to rebuild the inventory graph on its next rerun."""
+    get_data_versions().bump("inventory")
+
+
+@st.cache_resource
+def get_sqlite_store(path=INVENTORY_DB):
+    """Returns the process-wide connection to the persistent inventory store."""
+    return SqliteStore(path)
+
+
+def save_inventory(inventory, path=INVENTORY_DB):
+    """Replaces the persistent store's contents with `inventory`."""
+    with inventory.reading():
+        arrays = dependency_arrays(inventory.dependencies, inventory.store)
+    sqlite_store = get_sqlite_store(path)
+    sqlite_store.save(inventory.store, arrays)
+    # The stored systems are the inventory's, so its index serves the store as well
+    inventory_search_index(inventory).save(_search_index_path(path), sqlite_store.fingerprint)
+
+
+@st.cache_resource(max_entries=2)
+def stored_search_index(path, version):
+    """Returns the typeahead index of the systems in the persistent store.
+
+    The index is saved next to the store and reused until the stored systems
+    change; only then is it rebuilt from the store, read column by column.
+    """
+    sqlite_store = get_sqlite_store(path)
+    index = SearchIndex.load(_search_index_path(path), sqlite_store.fingerprint)
+    if index is None:
+        columns = {column: sqlite_store.column(column) for column in SEARCH_COLUMNS}
+        index = store_search_index(SystemStore(columns, names=sqlite_store.names()))
+        index.save(_search_index_path(path), sqlite_store.fingerprint)
+    return index
+
+
+def inventory_search_index(inventory):
+    """Returns the typeahead index of an inventory graph, built once per graph."""
+    # Dependency changes leave the searchable fields as they are
+    return inventory.memoize("search_index", lambda: store_search_index(inventory.store), lambda index, changes: True)
+
+
+@st.cache_resource(max_entries=16)
+def _stored_impact_subgraph(path, version, name, direction):
+    store, dependencies = get_sqlite_store(path).impact_subgraph(name, direction)
+    return InventoryGraph(store, dependency_triples(dependencies, store.names), version)
+
+
+def load_stored_impact(name, direction, path=INVENTORY_DB):
+    """Returns the graph of `name` and the systems it reaches in `direction`, queried from the store."""
+    return _stored_impact_subgraph(path, get_sqlite_store(path).version, name, direction)
+
+
+@st.cache_data(max_entries=1_000)
+def _stored_impact_count(path, version, name, direction):
+    return get_sqlite_store(path).impact_count(name, direction)
+
+
+def stored_impact_count(name, direction, path=INVENTORY_DB):
+    """Returns how many stored systems `name` reaches in `direction`, queried once per store version."""
+    return _stored_impact_count(path, get_sqlite_store(path).version, name, direction)
+
+
+def dependency_feed(inventory, path):
+    """Returns the feed of dependency changes from `path` applied to `inventory`, one per graph and file."""
+    return inventory.memoize(
+        ("dependency_feed", os.path.abspath(path)), lambda: DependencyFeed(path), lambda feed, changes: True
+    )
+
+
+def filtered_inventory(inventory, system_filter):
+    """Returns the part of an inventory graph matching a `SystemFilter`, built once per graph and filter."""
+    return inventory.memoize(
+        ("filter", system_filter.canonical), lambda: inventory.subgraph(system_filter.rows(inventory.store))
+    )
+
+
+@st.cache_resource(max_entries=2)
+def _stored_attributes(path, version):
+    # The filterable columns only, so filters are evaluated without loading the whole inventory
+    sqlite_store = get_sqlite_store(path)
+    columns = {column: sqlite_store.column(column) for column in FILTER_COLUMNS}
+    return SystemStore(columns, names=sqlite_store.names())
+
+
+@st.cache_resource(max_entries=16)
+def _stored_filtered_subgraph(path, version, canonical, _system_filter):
+    rows = _system_filter.rows(_stored_attributes(path, version))
+    store, dependencies = get_sqlite_store(path).load(rows)
+    return InventoryGraph(store, dependency_triples(dependencies, store.names), version)
+
+
+def load_stored_filtered(system_filter, path=INVENTORY_DB):
+    """Returns the graph of the stored systems matching a `SystemFilter` and the dependencies among them."""
+    return _stored_filtered_subgraph(path, get_sqlite_store(path).version, system_filter.canonical, system_filter)
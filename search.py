@@ -0,0 +1,265 @@
+import os
+import re
+from bisect import bisect_left
+
+import numpy as np
+
+# Searchable fields and the weight of a match in each, best first
+FIELD_WEIGHTS = {"System Name": 4.0, "System ID": 3.0, "Agency Name": 2.0, "Ministry Family": 1.0}
+# Store columns behind the searchable fields other than the name
+SEARCH_COLUMNS = ["System ID", "Agency Name", "Ministry Family Name"]
+
+EXACT_BONUS = 0.5
+# Extra score, per unit of field weight, for each two consecutive words matching within the same field
+PHRASE_BONUS = 2.0
+NAME_MATCH_BONUS = 100.0
+# Trigram matches below this similarity are not suggested
+MIN_SIMILARITY = 0.3
+
+WORD = re.compile(r"[a-z0-9]+")
+# Letter and digit runs within a word
+WORD_PART = re.compile(r"[a-z]+|[0-9]+")
+
+# Bump when the saved index layout changes so stale files are rebuilt
+INDEX_FORMAT = 1
+# Arrays written by `SearchIndex.save`, besides the names and tokens
+SAVED_ARRAYS = ("offsets", "rows_of", "weights_of", "alphabetical", "trigram_keys", "trigram_offsets", "trigram_ids", "trigram_counts")
+
+
+def normalize(text):
+    return " ".join(WORD.findall(str(text).lower()))
+
+
+def tokenize(text):
+    """Returns the search tokens of a value: its words, and the letter and digit runs of mixed words."""
+    tokens = set()
+    for word in normalize(text).split():
+        tokens.add(word)
+        parts = WORD_PART.findall(word)
+        if len(parts) > 1:
+            tokens.update(parts)
+    return tokens
+
+
+def trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _trigram_code(trigram):
+    # Code points fit in 21 bits, so a trigram packs into one integer
+    return (ord(trigram[0]) << 42) | (ord(trigram[1]) << 21) | ord(trigram[2])
+
+
+def _token_trigrams(tokens):
+    """Returns `(token ids, trigram codes)`, one pair per distinct trigram of each token, sorted by code."""
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+    id_parts, code_parts = [], []
+    # Tokens of one length pad to the same width, so their characters form one matrix
+    for length in np.unique(lengths).tolist():
+        ids = np.flatnonzero(lengths == length)
+        padded = np.array([f"  {tokens[i]} " for i in ids.tolist()], dtype=f"<U{length + 3}")
+        chars = padded.view(np.uint32).reshape(len(ids), length + 3).astype(np.int64)
+        codes = (chars[:, :-2] << 42) | (chars[:, 1:-1] << 21) | chars[:, 2:]
+        id_parts.append(np.repeat(ids, length + 1))
+        code_parts.append(codes.ravel())
+    ids = np.concatenate(id_parts) if id_parts else np.empty(0, dtype=np.int64)
+    codes = np.concatenate(code_parts) if code_parts else np.empty(0, dtype=np.int64)
+    order = np.lexsort((ids, codes))
+    ids, codes = ids[order], codes[order]
+    distinct = np.ones(len(ids), dtype=bool)
+    distinct[1:] = (ids[1:] != ids[:-1]) | (codes[1:] != codes[:-1])
+    return ids[distinct], codes[distinct]
+
+
+def _pack(values):
+    return np.frombuffer("\x00".join(values).encode("utf-8"), dtype=np.uint8)
+
+
+def _unpack(data, count):
+    return data.tobytes().decode("utf-8").split("\x00") if count else []
+
+
+class SearchIndex:
+    """Typeahead index over system names, IDs, agencies and ministry families.
+
+    Every distinct token is kept once in a sorted vocabulary, so the tokens
+    starting with a typed prefix are one contiguous slice found by bisection
+    (a flattened prefix trie). Each token carries the rows it occurs in and
+    the weight of its best field. Words no token starts with fall back to a
+    trigram index over the vocabulary, which catches typos and infixes.
+    Queries return the top `limit` names, so only a handful of options ever
+    reach the browser. `save` and `load` keep a built index on disk.
+    """
+
+    def __init__(self, names, fields):
+        self.names = list(names)
+        self._row_of = {name: row for row, name in enumerate(self.names)}
+        # Categorical columns repeat a few values, so each distinct value is tokenised once
+        fields = [("System Name", self.names)] + list(fields.items())
+        columns = []
+        for field, values in fields:
+            distinct, inverse = np.unique(np.asarray(values, dtype=object).astype(str), return_inverse=True)
+            columns.append((FIELD_WEIGHTS[field], inverse, [tokenize(value) for value in distinct.tolist()]))
+        self.tokens = sorted({token for _, _, value_tokens in columns for tokens in value_tokens for token in tokens})
+        token_id = {token: i for i, token in enumerate(self.tokens)}
+
+        # One (token, row, weight) posting per token of every row's value, grouped by token afterwards
+        token_parts, row_parts, weight_parts = [], [], []
+        for weight, inverse, value_tokens in columns:
+            per_value = np.array([len(tokens) for tokens in value_tokens], dtype=np.int64)
+            value_ids = np.array([token_id[token] for tokens in value_tokens for token in tokens], dtype=np.int64)
+            starts = np.cumsum(per_value) - per_value
+            counts = per_value[inverse]
+            first = np.repeat(starts[inverse] - np.cumsum(counts) + counts, counts)
+            token_parts.append(value_ids[first + np.arange(counts.sum())])
+            row_parts.append(np.repeat(np.arange(len(inverse)), counts))
+            weight_parts.append(np.full(counts.sum(), weight))
+        tokens_of = np.concatenate(token_parts)
+        order = np.argsort(tokens_of, kind="stable")
+        self._offsets = np.searchsorted(tokens_of[order], np.arange(len(self.tokens) + 1))
+        self._rows_of = np.concatenate(row_parts)[order]
+        self._weights_of = np.concatenate(weight_parts)[order]
+
+        # Tokens per trigram, grouped by trigram code, for words that match no prefix
+        ids, codes = _token_trigrams(self.tokens)
+        self._trigram_keys, starts = np.unique(codes, return_index=True)
+        self._trigram_offsets = np.append(starts, len(codes))
+        self._trigram_ids = ids
+        self._trigram_counts = np.bincount(ids, minlength=len(self.tokens)).astype(np.float64)
+        # Position of every name in alphabetical order, to break ties and list names for an empty query
+        self._alphabetical = np.argsort(np.array(self.names, dtype=object), kind="stable")
+        self._rank_names()
+
+    def _rank_names(self):
+        self._name_rank = np.empty(len(self.names), dtype=np.int64)
+        self._name_rank[self._alphabetical] = np.arange(len(self.names))
+
+    def save(self, path, stamp):
+        """Writes the index to `path`, for `load` to return while `stamp` still matches.
+
+        A read-only deployment still works; the index is then built once per process.
+        """
+        arrays = {name: getattr(self, f"_{name}") for name in SAVED_ARRAYS}
+        try:
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as f:
+                np.savez(f, stamp=np.array(f"{INDEX_FORMAT}:{stamp}"), names=_pack(self.names), tokens=_pack(self.tokens), **arrays)
+            os.replace(temporary, path)
+        except OSError:
+            pass
+
+    @classmethod
+    def load(cls, path, stamp):
+        """Returns the index saved at `path` with the same `stamp`, or `None` if there is none."""
+        try:
+            with np.load(path) as saved:
+                if saved["stamp"].item() != f"{INDEX_FORMAT}:{stamp}":
+                    return None
+                arrays = {name: saved[name] for name in SAVED_ARRAYS}
+                names, tokens = saved["names"], saved["tokens"]
+        except (OSError, ValueError, KeyError):
+            return None
+        index = cls.__new__(cls)
+        for name, array in arrays.items():
+            setattr(index, f"_{name}", array)
+        index.names = _unpack(names, len(index._alphabetical))
+        index.tokens = _unpack(tokens, len(index._offsets) - 1)
+        index._row_of = {name: row for row, name in enumerate(index.names)}
+        index._rank_names()
+        return index
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._row_of
+
+    def _matches(self, word):
+        """Returns the ids of the tokens matching `word` and a score for each.
+
+        A number only matches the same whole token, so "3" finds Agency 3
+        but not Agency 30 or System 312.
+        """
+        start = bisect_left(self.tokens, word)
+        if word.isdigit():
+            if start < len(self.tokens) and self.tokens[start] == word:
+                return np.array([start]), np.array([1 + EXACT_BONUS])
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        stop = bisect_left(self.tokens, word + "\uffff", start)
+        if stop > start:
+            ids = np.arange(start, stop)
+            scores = np.ones(len(ids))
+            if self.tokens[start] == word:
+                scores[0] += EXACT_BONUS
+            return ids, scores
+        # No token starts with the word: rank tokens by the share of trigrams they have in common
+        query = np.array(sorted(_trigram_code(trigram) for trigram in trigrams(word)), dtype=np.int64)
+        keys = np.searchsorted(self._trigram_keys, query)
+        found = keys < len(self._trigram_keys)
+        keys = keys[found][self._trigram_keys[keys[found]] == query[found]].tolist()
+        hits = [self._trigram_ids[self._trigram_offsets[k]:self._trigram_offsets[k + 1]] for k in keys]
+        if not hits:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        ids, shared = np.unique(np.concatenate(hits), return_counts=True)
+        similarity = shared / np.maximum(self._trigram_counts[ids], len(query))
+        keep = similarity >= MIN_SIMILARITY
+        return ids[keep], similarity[keep]
+
+    def search(self, query, limit=20):
+        """Returns up to `limit` system names matching every word of `query`, best first.
+
+        Words other than numbers match as prefixes, so suggestions follow the
+        user's typing. Each word scores its best field in a row, and
+        consecutive words matching in the same field score extra, so "agency
+        3 mf 2" ranks Agency 3 systems of MF 2 first. An exact system name
+        comes first. An empty query lists the first names in alphabetical
+        order.
+        """
+        words = normalize(query).split()
+        if not words:
+            return [self.names[row] for row in self._alphabetical[:limit].tolist()]
+
+        total = np.zeros(len(self.names))
+        matched = np.ones(len(self.names), dtype=bool)
+        # Rows where the previous word matched, per field weight
+        previous = None
+        for word in words:
+            ids, scores = self._matches(word)
+            starts, counts = self._offsets[ids], self._offsets[ids + 1] - self._offsets[ids]
+            positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            rows, weights = self._rows_of[positions], self._weights_of[positions]
+            best = np.zeros(len(self.names))
+            np.maximum.at(best, rows, weights * np.repeat(scores, counts))
+            total += best
+            matched &= best > 0
+            if len(words) > 1:
+                in_field = {}
+                for weight in FIELD_WEIGHTS.values():
+                    in_field[weight] = np.zeros(len(self.names), dtype=bool)
+                    in_field[weight][rows[weights == weight]] = True
+                    if previous is not None:
+                        total[in_field[weight] & previous[weight]] += PHRASE_BONUS * weight
+                previous = in_field
+        exact = self._row_of.get(query.strip())
+        if exact is not None:
+            total[exact] += NAME_MATCH_BONUS
+
+        candidates = np.flatnonzero(matched)
+        if len(candidates) > limit:
+            # Keep everything scoring at least the limit-th best, then order exactly
+            threshold = np.partition(total[candidates], len(candidates) - limit)[len(candidates) - limit]
+            candidates = candidates[total[candidates] >= threshold]
+        order = np.lexsort((self._name_rank[candidates], -total[candidates]))
+        return [self.names[row] for row in candidates[order][:limit].tolist()]
+
+
+def store_search_index(store):
+    """Builds the search index of a `SystemStore` holding at least the `SEARCH_COLUMNS`."""
+    ids = store.columns["System ID"]
+    fields = {
+        "System ID": ids if ids.dtype == object else np.char.add("SYS", ids.astype(str)),
+        "Agency Name": store.labels("Agency Name"),
+        "Ministry Family": store.labels("Ministry Family Name"),
+    }
+    return SearchIndex(store.names, fields)
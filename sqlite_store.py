@@ -0,0 +1,246 @@
+import sqlite3
+import threading
+
+import numpy as np
+
+from inventory import CATEGORIES, RML_INPUTS, UNKNOWN, SystemStore, score_rml
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS columns (name TEXT PRIMARY KEY, dtype TEXT NOT NULL, position INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS dependencies (source INTEGER NOT NULL, target INTEGER NOT NULL, type INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS dependencies_source ON dependencies (source, type);
+CREATE INDEX IF NOT EXISTS dependencies_target ON dependencies (target, type);
+"""
+
+# Columns of the systems table that get their own index
+INDEXED_COLUMNS = ["Agency Name", "System Criticality"]
+
+UPSTREAM, DOWNSTREAM = 0, 1
+
+# Columns read and written by `score_rml`
+RML_FIELDS = [*RML_INPUTS, "Endorsed RML", "Computed RML", "RML Alignment"]
+
+# Recursive steps per direction: (join column, column followed, dependency type or None for any).
+# A "Downstream" row points from a provider to its dependent and an "Upstream" row the other way,
+# so failures spread source -> target on Downstream rows and target -> source on Upstream rows.
+IMPACT_STEPS = {
+    "downstream": [("source", "target", DOWNSTREAM), ("target", "source", UPSTREAM)],
+    "upstream": [("source", "target", UPSTREAM), ("target", "source", DOWNSTREAM)],
+    "connected": [("source", "target", None), ("target", "source", None)],
+}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _impact_cte(direction):
+    steps = []
+    for join, follow, dep_type in IMPACT_STEPS[direction]:
+        condition = f" AND d.type = {dep_type}" if dep_type is not None else ""
+        steps.append(f"SELECT d.{follow} FROM dependencies d JOIN reached r ON d.{join} = r.id{condition}")
+    # Several recursive selects in one CTE need SQLite 3.34 or later
+    return "WITH RECURSIVE reached(id) AS (SELECT ? UNION " + " UNION ".join(steps) + ")"
+
+
+def _to_sql(column):
+    if np.issubdtype(column.dtype, np.datetime64):
+        days = column.astype("datetime64[D]").astype(object)
+        missing = np.isnat(column)
+        days[~missing] = column[~missing].astype("datetime64[D]").astype(np.int64)
+        days[missing] = None
+        return days.tolist()
+    return column.tolist()
+
+
+def _from_sql(values, dtype):
+    if dtype == "object":
+        return np.array(values, dtype=object)
+    if dtype.startswith("datetime64"):
+        days = np.array([np.iinfo(np.int64).min if v is None else v for v in values], dtype=np.int64)
+        return days.astype("datetime64[D]")
+    return np.array(values, dtype=dtype)
+
+
+class SqliteStore:
+    """Persistent systems and dependencies in a local SQLite file.
+
+    Systems are stored column by column with their integer codes, keyed by
+    their row in the store, so a saved inventory loads back into an
+    identical `SystemStore`. Impact queries run as recursive CTEs inside the
+    database, which lets the app answer them without loading the inventory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            self._connection.executescript(SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _query(self, sql, parameters=()):
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def _meta(self, key, default=None):
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else default
+
+    @property
+    def version(self):
+        """Save counter, bumped every time the store contents are replaced."""
+        return int(self._meta("version", 0))
+
+    @property
+    def fingerprint(self):
+        """`SystemStore.fingerprint()` of the saved inventory."""
+        return self._meta("fingerprint")
+
+    def _columns(self):
+        return self._query("SELECT name, dtype FROM columns ORDER BY position")
+
+    def __len__(self):
+        if not self._columns():
+            return 0
+        return self._query("SELECT count(*) FROM systems")[0][0]
+
+    def save(self, store, dependencies):
+        """Replaces the stored inventory with `store` and its `source`/`target`/`type` dependency arrays.
+
+        Computed RML and RML Alignment are scored again on the way in, so
+        every query reads the same values `load` returns.
+        """
+        columns = dict(store.columns)
+        if set(RML_FIELDS) <= set(columns):
+            for field in ("Computed RML", "RML Alignment"):
+                columns[field] = columns[field].copy()
+            score_rml(columns)
+        fields = list(columns)
+        definitions = ", ".join(f"{_quote(field)}" for field in fields)
+        rows = zip(range(len(store)), store.names, *(_to_sql(columns[f]) for f in fields))
+        edges = zip(
+            np.asarray(dependencies["source"]).tolist(),
+            np.asarray(dependencies["target"]).tolist(),
+            np.asarray(dependencies["type"]).tolist(),
+        )
+        with self._lock, self._connection:
+            connection = self._connection
+            # The driver only opens a transaction before DML, so without this the DROP would be
+            # committed on its own and a failed save would leave the store without systems
+            connection.execute("BEGIN")
+            connection.execute("DROP TABLE IF EXISTS systems")
+            connection.execute("DELETE FROM columns")
+            connection.execute("DELETE FROM dependencies")
+            connection.execute(f"CREATE TABLE systems (row INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, {definitions})")
+            connection.executemany(
+                "INSERT INTO columns VALUES (?, ?, ?)",
+                [(field, str(columns[field].dtype), i) for i, field in enumerate(fields)],
+            )
+            placeholders = ", ".join("?" * (len(fields) + 2))
+            connection.executemany(f"INSERT INTO systems VALUES ({placeholders})", rows)
+            connection.executemany("INSERT INTO dependencies VALUES (?, ?, ?)", edges)
+            for field in INDEXED_COLUMNS:
+                if field in store.columns:
+                    name = "systems_" + field.lower().replace(" ", "_")
+                    connection.execute(f"CREATE INDEX {name} ON systems ({_quote(field)})")
+            connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('version', ?), ('fingerprint', ?)",
+                (self.version + 1, store.fingerprint()),
+            )
+            connection.execute("ANALYZE")
+
+    def names(self):
+        """Returns every system name in store order."""
+        return [name for (name,) in self._query("SELECT name FROM systems ORDER BY row")]
+
+    def column(self, field):
+        """Returns one stored column in store order, decoded as `load` does."""
+        dtype = dict(self._columns())[field]
+        return _from_sql([value for (value,) in self._query(f"SELECT {_quote(field)} FROM systems ORDER BY row")], dtype)
+
+    def dependency_count(self):
+        return self._query("SELECT count(*) FROM dependencies")[0][0]
+
+    def counts(self, field):
+        """Returns the number of systems per category of `field`, counted by the database."""
+        categories = CATEGORIES[field]
+        totals = dict.fromkeys(categories, 0)
+        for code, count in self._query(f"SELECT {_quote(field)}, count(*) FROM systems GROUP BY 1"):
+            totals[categories[code] if code is not None and code >= 0 else UNKNOWN] = count
+        return totals
+
+    def _row(self, name):
+        rows = self._query("SELECT row FROM systems WHERE name = ?", (name,))
+        if not rows:
+            raise KeyError(name)
+        return rows[0][0]
+
+    def impacted_rows(self, name, direction="downstream"):
+        """Returns the rows reached from `name` in `direction`, excluding its own row.
+
+        `direction` is "downstream" (systems that break if it fails),
+        "upstream" (systems it relies on) or "connected" (either).
+        """
+        row = self._row(name)
+        sql = _impact_cte(direction) + " SELECT id FROM reached WHERE id != ?"
+        return [r for (r,) in self._query(sql, (row, row))]
+
+    def impact_count(self, name, direction="downstream"):
+        """Returns how many systems are reached from `name` in `direction`."""
+        row = self._row(name)
+        return self._query(_impact_cte(direction) + " SELECT count(*) FROM reached WHERE id != ?", (row, row))[0][0]
+
+    def load(self, rows=None):
+        """Loads the stored inventory, or only the given `rows` and the dependencies among them.
+
+        Returns `(store, dependencies)` in the shape produced by
+        `generate_inventory` and `ingest_inventory`; with `rows`, dependency
+        endpoints are renumbered to positions in the loaded subset.
+        """
+        columns = self._columns()
+        select = ", ".join(["row", "name"] + [_quote(name) for name, _ in columns])
+        with self._lock:
+            connection = self._connection
+            if rows is None:
+                records = connection.execute(f"SELECT {select} FROM systems ORDER BY row").fetchall()
+                edges = connection.execute("SELECT source, target, type FROM dependencies").fetchall()
+            else:
+                connection.execute("CREATE TEMP TABLE IF NOT EXISTS selected (row INTEGER PRIMARY KEY)")
+                connection.execute("DELETE FROM selected")
+                connection.executemany("INSERT OR IGNORE INTO selected VALUES (?)", ((int(r),) for r in rows))
+                records = connection.execute(
+                    f"SELECT {select} FROM systems JOIN selected USING (row) ORDER BY row"
+                ).fetchall()
+                edges = connection.execute(
+                    "SELECT source, target, type FROM dependencies"
+                    " WHERE source IN (SELECT row FROM selected) AND target IN (SELECT row FROM selected)"
+                ).fetchall()
+
+        fields = list(zip(*records)) if records else [()] * (len(columns) + 2)
+        position = {row: i for i, row in enumerate(fields[0])}
+        store = SystemStore(
+            {name: _from_sql(values, dtype) for (name, dtype), values in zip(columns, fields[2:])},
+            names=list(fields[1]),
+        )
+        source, target, dep_type = zip(*edges) if edges else ((), (), ())
+        dependencies = {
+            "source": np.array([position[s] for s in source], dtype=np.int64),
+            "target": np.array([position[t] for t in target], dtype=np.int64),
+            "type": np.array(dep_type, dtype=np.int8),
+        }
+        return store, dependencies
+
+    def impact_subgraph(self, name, direction="downstream"):
+        """Loads `name`, every system reached from it in `direction` and the dependencies among them."""
+        return self.load([self._row(name)] + self.impacted_rows(name, direction))
@@ -2,89 +2,47 @@ import streamlit as st
 # Must be the first Streamlit command
 st.set_page_config(page_title="System Impact Analysis", layout="wide")
 
-from pyvis.network import Network
-import networkx as nx
-import streamlit.components.v1 as components
-import tempfile
 import os
-import random
-from datetime import datetime, timedelta
+
 import pandas as pd
+from render_cache import RenderCache
+from vis_component import vis_network
+from layout import force_layout, layered_layout, layers_hold, settle_nodes
+from impact import neighbourhood
+from filters import FilterError, SystemFilter
+from ingest import IngestError
+from inventory import dependency_arrays
+from parallel_impact import criticality_weights, impact_table
+from resources import (
+    dependency_feed,
+    filtered_inventory,
+    get_sqlite_store,
+    inventory_search_index,
+    invalidate_inventory,
+    load_ingested_inventory,
+    load_stored_filtered,
+    load_stored_impact,
+    load_synthetic_inventory,
+    save_inventory,
+    stored_impact_count,
+    stored_search_index,
+)
+
+# Systems suggested for the text typed in the search box
+SEARCH_SUGGESTIONS = 20
+# How often a watched dependency-change file is checked for new events
+FEED_POLL_SECONDS = 2
+
+FILTER_HELP = """Combine comparisons with AND, OR, NOT and parentheses, e.g.
+`criticality = High AND agency = Agency 3 AND alignment = Not Aligned`.
+Fields: criticality, status, agency, ministry, security, sensitivity, rml,
+proposed rml, endorsed rml, alignment, availability, RTO, RPO or any date field.
+Use `IN (a, b)` for lists, `<`/`>` for numbers and dates, and `Unknown` for missing values."""
 
 # Initialize session state for password check
 if 'password_correct' not in st.session_state:
     st.session_state.password_correct = False
 
-def generate_random_date(start_year=2015):
-    start_date = datetime(start_year, 1, 1)
-    end_date = datetime.now()
-    days_between_dates = (end_date - start_date).days
-    random_number_of_days = random.randrange(days_between_dates)
-    return (start_date + timedelta(days=random_number_of_days)).strftime("%Y-%m-%d")
-
-def generate_system_data(system_number):
-    agencies = ["Agency 1", "Agency 2", "Agency 3", "Agency 4", "Agency 5", "Agency 6", "Agency 7", "Agency 8"]
-    ministry_families = ["MF 1", "MF 2", "MF 3", "MF 4", "MF 5"]
-    security_classifications = ["Official", "Restricted", "Confidential", "Secret"]
-    sensitivity_classifications = ["Sensitive Normal", "Non-Sensitive", "Sensitive High"]
-    system_criticality = ["Others", "SII", "High"]
-    rml_levels = ["Low", "Medium", "High"]
-    dependency_types = ["Upstream", "Downstream"]
-    
-    # Logic to ensure consistent criticality and RML relationships
-    chosen_criticality = random.choice(system_criticality)
-    
-    # Determine RML based on criticality
-    if chosen_criticality == "High":
-        possible_rml = ["Medium", "High"]
-        recommended_rml = "High"
-    elif chosen_criticality == "SII":
-        possible_rml = ["Medium", "High"]
-        recommended_rml = "Medium"
-    else:  # Others
-        possible_rml = ["Low", "Medium"]
-        recommended_rml = "Low"
-        
-    computed_rml = random.choice(possible_rml)
-    agency_proposed_rml = random.choice(possible_rml)
-    endorsed_rml = recommended_rml  # Using recommended RML as endorsed RML
-    
-    # Determine RML alignment
-    rml_alignment = "Aligned" if computed_rml == endorsed_rml else "Not Aligned"
-    
-    return {
-        "System Identity & Classification": {
-            "System ID": f"SYS{random.randint(1000, 9999)}",
-            "System Name": f"System {system_number}",
-            "System Description": f"Description for System {system_number}",
-            "System Status": random.choice(["Active", "Inactive", "Maintenance"]),
-            "Operational Date": generate_random_date(),
-            "Decommission Date": generate_random_date(2025),
-            "Agency Name": random.choice(agencies),
-            "Ministry Family Name": random.choice(ministry_families),
-            "Security Classification": random.choice(security_classifications),
-            "Sensitivity Classification": random.choice(sensitivity_classifications)
-        },
-        "Criticality & Risk": {
-            "System Criticality": chosen_criticality,
-            "Computed RML": computed_rml,
-            "Computed RML Date": generate_random_date(),
-            "Agency Proposed RML": agency_proposed_rml,
-            "RML Alignment": rml_alignment,
-            "Endorsed RML": endorsed_rml,
-            "RML Endorsement Date": generate_random_date()
-        },
-        "System Resilience": {
-            "Service Availability": f"{random.randint(90, 100)}%",
-            "RTO": f"{random.randint(1, 24)} hours",
-            "RPO": f"{random.randint(1, 12)} hours"
-        },
-        "Dependencies": {
-            "Dependency Type": random.choice(dependency_types),
-            "Dependency Status": random.choice(["Active", "Inactive"])
-        }
-    }
-
 def check_password():
     """Returns `True` if the user had the correct password."""
     if st.session_state.password_correct:
@@ -99,133 +57,65 @@ def check_password():
         return False
     return False
 
-# Main app
-if check_password():
-    st.title("🔄 System Impact Analysis")
 
-    # Initialize session state for systems data if not exists
-    if 'systems_data' not in st.session_state:
-        st.session_state.systems_data = {
-            f"System {i}": generate_system_data(i) for i in range(1, 51)
-        }
+def compute_layout(inventory, layout_type):
+    """Returns fixed node positions, computed once per shared graph and layout type.
 
-    # Create network graph
-    G = nx.DiGraph()
-    
-    # Add nodes
-    for system_name, system_info in st.session_state.systems_data.items():
-        G.add_node(system_name, **system_info)
-
-    # Generate dependencies with hierarchical structure
-    if 'dependencies' not in st.session_state:
-        st.session_state.dependencies = []
-        
-        # Create layered hierarchy (10 layers)
-        systems_list = list(st.session_state.systems_data.keys())
-        
-        # Sort systems by criticality to ensure high criticality systems are at the top
-        systems_by_criticality = {
-            "High": [],
-            "SII": [],
-            "Others": []
-        }
-        
-        for system in systems_list:
-            criticality = st.session_state.systems_data[system]["Criticality & Risk"]["System Criticality"]
-            systems_by_criticality[criticality].append(system)
-        
-        # Create layers
-        layers = [[] for _ in range(10)]  # 10 layers
-        
-        # Layer 0 (top) - Primarily High criticality systems
-        top_systems = (systems_by_criticality["High"] + 
-                      systems_by_criticality["SII"])[:5]
-        layers[0] = top_systems
-        remaining_systems = [s for s in systems_list if s not in top_systems]
-        
-        # Distribute remaining systems across layers
-        for layer_idx in range(1, 10):
-            # Number of systems in this layer (more in middle layers, fewer in bottom layers)
-            if layer_idx < 5:
-                num_systems = random.randint(4, 8)  # More systems in upper-middle layers
-            else:
-                num_systems = random.randint(2, 5)  # Fewer systems in lower layers
-                
-            if remaining_systems:
-                layer_systems = random.sample(remaining_systems, 
-                                            min(num_systems, len(remaining_systems)))
-                layers[layer_idx] = layer_systems
-                remaining_systems = [s for s in remaining_systems 
-                                   if s not in layer_systems]
-        
-        # Create dependencies between layers
-        for layer_idx in range(len(layers) - 1):
-            current_layer = layers[layer_idx]
-            next_layer = layers[layer_idx + 1]
-            
-            for system in current_layer:
-                # Create 2-4 downstream dependencies to next layer
-                num_dependencies = random.randint(2, 4)
-                if next_layer:
-                    downstream_systems = random.sample(next_layer, 
-                                                     min(num_dependencies, len(next_layer)))
-                    for downstream in downstream_systems:
-                        st.session_state.dependencies.append((system, downstream, "Downstream"))
-                        
-                        # Add some cross-layer dependencies (skip connections)
-                        if random.random() < 0.3 and layer_idx + 2 < len(layers):  # 30% chance
-                            skip_layer = layers[layer_idx + 2]
-                            if skip_layer:
-                                skip_system = random.choice(skip_layer)
-                                st.session_state.dependencies.append((downstream, skip_system, 
-                                                                   "Downstream"))
-        
-        # Add some upstream dependencies
-        for layer_idx in range(1, len(layers)):
-            current_layer = layers[layer_idx]
-            upper_layer = layers[layer_idx - 1]
-            
-            for system in current_layer:
-                # 20% chance of creating an upstream dependency
-                if random.random() < 0.2 and upper_layer:
-                    upstream = random.choice(upper_layer)
-                    st.session_state.dependencies.append((system, upstream, "Upstream"))
+    Hierarchical layers follow the direction failures spread in, so Upstream
+    and Downstream rows between the same systems do not fold into cycles.
+    Dependency changes move only the systems they touch; a hierarchical
+    layout is recomputed once a new edge points up or across its layers.
+    """
+    G = inventory.graph
+    if layout_type == "Hierarchical":
+        build = lambda: layered_layout(G.nodes(), inventory.impact_graph().edges(), layer_spacing=150)
+        update = lambda positions, changes: layers_hold(positions, changes.impact_added)
+    else:
+        build = lambda: force_layout(G.nodes(), G.edges())
+        update = lambda positions, changes: settle_nodes(positions, G, changes.added) or True
+    return inventory.memoize(("layout", layout_type), build, update)
 
-    # Add edges from session state
-    for source, target, dep_type in st.session_state.dependencies:
-        G.add_edge(source, target, dependency_type=dep_type)
 
-    # Sidebar for layout selection and system selection
-    layout_type = st.sidebar.radio(
-        "Select Layout Type",
-        ["Force-Directed", "Hierarchical"],
-        key="layout_selector"
-    )
+def rank_systems_by_impact(inventory):
+    """Returns every system's downstream impact analytics, ranked by criticality-weighted impact."""
+    def build():
+        store = inventory.store
+        # Computed from a copy so dependency changes are not held off for the whole ranking
+        with inventory.reading():
+            dependencies = dependency_arrays(inventory.dependencies, store)
+        # Large inventories are sharded across every core
+        ranking = impact_table(store, dependencies, criticality_weights(store))
+        return ranking.sort_values(["Weighted Impact", "Downstream Systems"], ascending=False)
+
+    return inventory.memoize("impact_ranking", build)
+
+
+@st.cache_resource
+def get_render_cache():
+    """Returns the process-wide LRU cache of built graph views."""
+    return RenderCache(max_entries=64)
 
-    system_options = ["Show All Systems"] + sorted(list(st.session_state.systems_data.keys()))
-    
-    # Initialize session state for selected system if not exists
-    if 'selected_system' not in st.session_state:
-        st.session_state.selected_system = "Show All Systems"
-    
-    selected_system = st.sidebar.selectbox(
-        "Select a system to analyze impact:",
-        options=system_options,
-        key='system_selector',
-        index=system_options.index(st.session_state.selected_system)
-    )
-    
-    # Update session state
-    st.session_state.selected_system = selected_system
 
-    # Create network visualization
-    net = Network(height="800px", width="100%", directed=True, bgcolor='#ffffff')
+def build_network_view(inventory, selected_system, layout_type, impact_direction="All Connected", hops=None):
+    """Returns the vis-network nodes, edges and options of the graph, coloured for the selected system.
+
+    With `hops`, only the selected system's neighbourhood within that many
+    steps is rendered, plus a "+N more" stub for every boundary system.
+    """
+    G = inventory.graph
+    store = inventory.store
+    shown = G
+    hidden = {}
+    criticality_of = store.labels("System Criticality")
+
+    # Create vis-network nodes and edges
+    nodes = []
+    edges = []
 
     if selected_system == "Show All Systems":
         # Show all systems with default color
         for node in G.nodes():
-            system_info = st.session_state.systems_data[node]
-            criticality = system_info["Criticality & Risk"]["System Criticality"]
+            criticality = criticality_of[store.position(node)]
             
             # Color coding based on system criticality
             color = {
@@ -234,52 +124,26 @@ if check_password():
                 "Others": "#44AA44"   # Green for others
             }.get(criticality, "#CCCCCC")
             
-            # Create detailed tooltip
-            tooltip = f"""
-System: {node}
-Criticality: {criticality}
-RML: {system_info['Criticality & Risk']['Endorsed RML']}
-Status: {system_info['System Identity & Classification']['System Status']}
-Agency: {system_info['System Identity & Classification']['Agency Name']}
-Ministry: {system_info['System Identity & Classification']['Ministry Family Name']}
-"""
-            net.add_node(node, color=color, title=tooltip)
-            
-        # Show overall statistics
-        st.sidebar.markdown("### System Statistics")
-        criticality_counts = {
-            "High": sum(1 for s in st.session_state.systems_data.values() 
-                       if s["Criticality & Risk"]["System Criticality"] == "High"),
-            "SII": sum(1 for s in st.session_state.systems_data.values() 
-                      if s["Criticality & Risk"]["System Criticality"] == "SII"),
-            "Others": sum(1 for s in st.session_state.systems_data.values() 
-                        if s["Criticality & Risk"]["System Criticality"] == "Others")
-        }
-
-        st.sidebar.markdown(f"Total Systems: {len(G.nodes())}")
-        st.sidebar.markdown(f"High Criticality: {criticality_counts['High']}")
-        st.sidebar.markdown(f"SII Systems: {criticality_counts['SII']}")
-        st.sidebar.markdown(f"Other Systems: {criticality_counts['Others']}")
-        st.sidebar.markdown(f"Total Dependencies: {len(G.edges())}")
+            # Tooltips are fetched on hover (see system_tooltip), so nodes carry no title
+            nodes.append({"id": node, "label": node, "color": color})
 
     else:
         # Impact analysis for selected system
-        impacted_systems = set()
-        def find_dependencies(node, visited):
-            if node not in visited:
-                visited.add(node)
-                impacted_systems.add(node)
-                for successor in G.successors(node):
-                    find_dependencies(successor, visited)
-                for predecessor in G.predecessors(node):
-                    find_dependencies(predecessor, visited)
-
-        find_dependencies(selected_system, set())
+        if impact_direction == "Downstream":
+            impacted_systems = inventory.reachability().downstream(selected_system)
+        elif impact_direction == "Upstream":
+            impacted_systems = inventory.reachability().upstream(selected_system)
+        else:
+            impacted_systems = inventory.connectivity().impacted(selected_system)
+
+        if hops is not None:
+            direction = {"Downstream": "downstream", "Upstream": "upstream"}.get(impact_direction, "both")
+            depth, hidden = neighbourhood(inventory.impact_graph(), selected_system, hops, direction)
+            shown = G.subgraph(depth)
 
         # Add nodes with impact-based colors
-        for node in G.nodes():
-            system_info = st.session_state.systems_data[node]
-            criticality = system_info["Criticality & Risk"]["System Criticality"]
+        for node in shown.nodes():
+            criticality = criticality_of[store.position(node)]
             
             if node == selected_system:
                 color = "#FF0000"  # Red for selected system
@@ -296,26 +160,53 @@ Ministry: {system_info['System Identity & Classification']['Ministry Family Name
                     "Others": "#44AA44"   # Green for others
                 }.get(criticality, "#CCCCCC")
             
-            tooltip = f"""
-System: {node}
-Criticality: {criticality}
-RML: {system_info['Criticality & Risk']['Endorsed RML']}
-Status: {system_info['System Identity & Classification']['System Status']}
-Agency: {system_info['System Identity & Classification']['Agency Name']}
-Ministry: {system_info['System Identity & Classification']['Ministry Family Name']}
-"""
-            net.add_node(node, color=color, title=tooltip)
+            nodes.append({"id": node, "label": node, "color": color})
+
+    # Summary stubs for the systems left outside the neighbourhood
+    stub_edges = []
+    for system, count in hidden.items():
+        stub = f"+more:{system}"
+        nodes.append({
+            "id": stub,
+            "label": f"+{count} more",
+            "color": "#EEEEEE",
+            "shape": "box",
+            "title": f"{count} more connected systems beyond {system}"
+        })
+        stub_edges.append((system, stub))
+        edges.append({
+            "id": f"{system}->{stub}",
+            "from": system,
+            "to": stub,
+            "color": "#AAAAAA",
+            "dashes": True,
+            "arrows": {"to": {"enabled": False}}
+        })
+
+    # Place nodes server-side so the browser does not run the physics simulation
+    if shown is G:
+        positions = compute_layout(inventory, layout_type)
+    elif layout_type == "Hierarchical":
+        layered_edges = list(inventory.impact_graph().subgraph(shown.nodes()).edges()) + stub_edges
+        positions = layered_layout([n["id"] for n in nodes], layered_edges, layer_spacing=150)
+    else:
+        positions = force_layout([n["id"] for n in nodes], list(shown.edges()) + stub_edges)
+    for node in nodes:
+        node["x"], node["y"] = positions[node["id"]]
 
     # Add edges with visual distinction between upstream and downstream
-    for edge in G.edges(data=True):
+    for edge in shown.edges(data=True):
         source, target = edge[0], edge[1]
         dep_type = edge[2].get('dependency_type', 'Unknown')
         edge_color = "#FF0000" if dep_type == "Upstream" else "#0000FF"  # Red for upstream, Blue for downstream
-        edge_style = "dashed" if dep_type == "Upstream" else "solid"
-        net.add_edge(source, target, 
-                    title=f"Dependency Type: {dep_type}",
-                    color=edge_color,
-                    style=edge_style)
+        edges.append({
+            "id": f"{source}->{target}",
+            "from": source,
+            "to": target,
+            "title": f"Dependency Type: {dep_type}",
+            "color": edge_color,
+            "dashes": dep_type == "Upstream"
+        })
 
     # Set network options based on layout type
     if layout_type == "Hierarchical":
@@ -349,19 +240,6 @@ Ministry: {system_info['System Identity & Classification']['Ministry Family Name
                 },
                 "margin": 10
             },
-            "layout": {
-                "hierarchical": {
-                    "enabled": true,
-                    "direction": "UD",
-                    "sortMethod": "directed",
-                    "nodeSpacing": 200,
-                    "treeSpacing": 200,
-                    "levelSeparation": 150,
-                    "blockShifting": true,
-                    "edgeMinimization": true,
-                    "parentCentralization": true
-                }
-            },
             "interaction": {
                 "hover": true,
                 "navigationButtons": true,
@@ -377,24 +255,7 @@ Ministry: {system_info['System Identity & Classification']['Ministry Family Name
         network_options = """
         {
             "physics": {
-                "enabled": true,
-                "forceAtlas2Based": {
-                    "gravitationalConstant": -2000,
-                    "centralGravity": 0.005,
-                    "springLength": 200,
-                    "springConstant": 0.05,
-                    "damping": 0.9,
-                    "avoidOverlap": 1
-                },
-                "solver": "forceAtlas2Based",
-                "stabilization": {
-                    "enabled": true,
-                    "iterations": 200,
-                    "updateInterval": 50,
-                    "fit": true
-                },
-                "minVelocity": 0.75,
-                "maxVelocity": 30
+                "enabled": false
             },
             "edges": {
                 "smooth": {
@@ -431,15 +292,259 @@ Ministry: {system_info['System Identity & Classification']['Ministry Family Name
         }
         """
 
-    # Set the network options
-    net.set_options(network_options)
-
-    # Display the network
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.html') as tmp_file:
-            net.save_graph(tmp_file.name)
-            with open(tmp_file.name, 'r', encoding='utf-8') as f:
-                components.html(f.read(), height=800)
-            os.unlink(tmp_file.name)
-    except Exception as e:
-        st.error(f"An error occurred: {str(e)}")
+    return nodes, edges, network_options
+
+
+@st.cache_data(max_entries=10_000)
+def system_tooltip(graph_hash, node, _inventory):
+    """Returns the hover tooltip of one system, formatted once per graph version."""
+    store = _inventory.store
+    if node not in store:
+        return ""
+    system_info = store.nested(node)
+    return f"""System: {node}
+Criticality: {system_info['Criticality & Risk']['System Criticality']}
+RML: {system_info['Criticality & Risk']['Endorsed RML']}
+Status: {system_info['System Identity & Classification']['System Status']}
+Agency: {system_info['System Identity & Classification']['Agency Name']}
+Ministry: {system_info['System Identity & Classification']['Ministry Family Name']}"""
+
+
+def select_from_graph():
+    """Moves the selection to the system clicked in the graph."""
+    value = st.session_state.get("network") or {}
+    clicked = value.get("selected")
+    if value.get("event") == "select" and clicked and not clicked.startswith("+more:"):
+        st.session_state.system_selector = clicked
+        st.session_state.selected_system = clicked
+
+
+def show_network(inventory, selected_system, layout_type, impact_direction, hops):
+    """Shows the dependency graph coloured for the selected system; clicking a system selects it."""
+    # Build the view only when the graph or view changed; the component then receives just the diff
+    # Dependency changes are applied in place, so hold them off until the view matches its key
+    with inventory.reading():
+        cache_key = (inventory.graph_hash, layout_type, selected_system, impact_direction, hops)
+        nodes, edges, network_options = get_render_cache().get_or_render(
+            cache_key, lambda: build_network_view(inventory, selected_system, layout_type, impact_direction, hops)
+        )
+    vis_network(
+        nodes,
+        edges,
+        network_options,
+        height=800,
+        key="network",
+        on_change=select_from_graph,
+        tooltip=lambda node: system_tooltip(inventory.graph_hash, node, inventory),
+        tooltip_key=inventory.graph_hash,
+        view_key=cache_key
+    )
+    st.caption(f"Selected: {selected_system}. Click a system in the graph to analyse it.")
+
+
+@st.fragment
+def analyse_systems(inventory, search_index, layout_type):
+    """Shows the system selection, its blast radius or the inventory statistics, and the graph.
+
+    Everything that depends on the selection lives in this fragment, so
+    picking a system here or clicking one in the graph reruns only this part
+    of the page. `inventory` is `None` when queries go to the SQLite store.
+    """
+    stored = inventory is None
+    sqlite_store = get_sqlite_store() if stored else None
+    controls, graph = st.columns([1, 3])
+
+    with controls:
+        # Initialize session state for selected system if not exists
+        if st.session_state.get('selected_system') not in search_index:
+            st.session_state.selected_system = "Show All Systems"
+
+        # Only the top suggestions for the typed text go to the browser, plus the current selection
+        query = st.text_input("Search systems", key="system_search", placeholder="Name, ID, agency or ministry family")
+        system_options = ["Show All Systems"] + search_index.search(query, limit=SEARCH_SUGGESTIONS)
+        if st.session_state.selected_system not in system_options:
+            system_options.insert(1, st.session_state.selected_system)
+        # The graph can also move the selection, so the widget state is kept in sync directly
+        if st.session_state.get('system_selector') not in system_options:
+            st.session_state.system_selector = st.session_state.selected_system
+
+        selected_system = st.selectbox(
+            "Select a system to analyze impact:",
+            options=system_options,
+            key='system_selector'
+        )
+
+        # Update session state
+        st.session_state.selected_system = selected_system
+
+        impact_direction = "All Connected"
+        hops = None
+        shown = None
+        if selected_system == "Show All Systems":
+            # Show overall statistics
+            st.markdown("### System Statistics")
+            if stored:
+                criticality_counts = sqlite_store.counts("System Criticality")
+                total_systems, total_dependencies = len(sqlite_store), sqlite_store.dependency_count()
+            else:
+                criticality_counts = inventory.store.counts("System Criticality")
+                total_systems, total_dependencies = len(inventory.graph.nodes()), inventory.edge_count
+
+            st.markdown(f"Total Systems: {total_systems}")
+            st.markdown(f"High Criticality: {criticality_counts['High']}")
+            st.markdown(f"SII Systems: {criticality_counts['SII']}")
+            st.markdown(f"Other Systems: {criticality_counts['Others']}")
+            st.markdown(f"Total Dependencies: {total_dependencies}")
+
+            # Narrow the overview to the systems matching a filter expression
+            filter_text = st.text_input(
+                "Filter systems", key="system_filter", placeholder="criticality = High AND agency = Agency 3", help=FILTER_HELP
+            )
+            if filter_text.strip():
+                try:
+                    system_filter = SystemFilter(filter_text)
+                except FilterError as e:
+                    st.error(f"Filter: {e}")
+                else:
+                    shown = load_stored_filtered(system_filter) if stored else filtered_inventory(inventory, system_filter)
+                    st.markdown(f"Matching systems: {len(shown.store)}")
+
+        else:
+            # Directional blast radius for the selected system
+            impact_direction = st.radio(
+                "Impact direction",
+                ["All Connected", "Downstream", "Upstream"],
+                key="impact_direction",
+                help="Downstream: systems that break if this system fails. Upstream: systems it relies on."
+            )
+            if stored:
+                # Recursive queries in the store, then load just the impacted subgraph for display
+                downstream_count = stored_impact_count(selected_system, "downstream")
+                upstream_count = stored_impact_count(selected_system, "upstream")
+                direction = {"All Connected": "connected", "Downstream": "downstream", "Upstream": "upstream"}
+                inventory = load_stored_impact(selected_system, direction[impact_direction])
+            else:
+                with inventory.reading():
+                    reachability = inventory.reachability()
+                    downstream_count = reachability.downstream_count(selected_system)
+                    upstream_count = reachability.upstream_count(selected_system)
+            # Ship only the selected system's neighbourhood unless the whole graph is asked for
+            if st.radio("Render", ["Neighbourhood", "Whole graph"], key="render_scope", horizontal=True) == "Neighbourhood":
+                hops = st.slider("Neighbourhood hops (k)", min_value=1, max_value=10, value=2, key="hops")
+            st.markdown("### Blast Radius")
+            st.markdown(f"Break if {selected_system} fails: {downstream_count}")
+            st.markdown(f"{selected_system} relies on: {upstream_count}")
+
+    with graph:
+        # Display the network, rendering it only when the graph or view changed
+        shown = shown or inventory
+        if shown is None:
+            st.info("Select a system or enter a filter to query the SQLite store.")
+            return
+        try:
+            show_network(shown, selected_system, layout_type, impact_direction, hops)
+        except Exception as e:
+            st.error(f"An error occurred: {str(e)}")
+
+
+@st.fragment(run_every=FEED_POLL_SECONDS)
+def watch_dependency_feed(inventory, path, graph_hash):
+    """Applies the dependency events appended to `path`; reruns the app once the shared graph has changed."""
+    feed = dependency_feed(inventory, path)
+    feed.poll(inventory)
+    if inventory.graph_hash != graph_hash:
+        # Changed here or by another session watching the same file
+        st.rerun()
+    report = feed.report
+    if not os.path.exists(path):
+        st.caption(f"Waiting for {path}")
+    else:
+        st.caption(f"Applied {report['events_applied']} of {report['events_read']} events from {path}")
+    if report["error_count"]:
+        st.warning(f"{report['error_count']} invalid lines skipped")
+        st.dataframe(pd.DataFrame(report["errors"], columns=["Line", "Reason"]), width="stretch", hide_index=True)
+
+
+# Main app
+if check_password():
+    st.title("🔄 System Impact Analysis")
+
+    # Inventory source: uploaded exports, or a synthetic inventory sized for load testing
+    data_source = st.sidebar.radio(
+        "Inventory source", ["Synthetic", "Upload", "SQLite Store"], key="data_source", horizontal=True
+    )
+    if data_source == "Upload":
+        with st.sidebar.expander("Inventory Files", expanded=True):
+            systems_file = st.file_uploader("Systems (CSV or Excel)", type=["csv", "xlsx"], key="systems_file")
+            dependencies_file = st.file_uploader("Dependencies (CSV or Excel)", type=["csv", "xlsx"], key="dependencies_file")
+        if systems_file is None:
+            st.info("Upload a systems export to analyse it, or switch back to the synthetic inventory.")
+            st.stop()
+        try:
+            inventory, reports = load_ingested_inventory(systems_file, dependencies_file)
+        except IngestError as e:
+            st.error(f"Could not ingest inventory: {e}")
+            st.stop()
+        for file_label, report in reports.items():
+            if report["error_count"]:
+                with st.sidebar.expander(f"{report['error_count']} rejected {file_label} rows"):
+                    st.dataframe(
+                        pd.DataFrame(report["errors"], columns=["Row", "Reason"]), width="stretch", hide_index=True
+                    )
+    elif data_source == "SQLite Store":
+        # Answer queries from the persistent store instead of loading the whole inventory
+        sqlite_store = get_sqlite_store()
+        st.sidebar.caption(f"Store: {sqlite_store.path}")
+        if not len(sqlite_store):
+            st.info("The SQLite store is empty. Save a synthetic or uploaded inventory to it first.")
+            st.stop()
+        inventory = None
+    else:
+        with st.sidebar.expander("Synthetic Inventory"):
+            num_systems = st.number_input("Number of systems", min_value=10, max_value=10_000_000, value=50, step=50)
+            inventory_seed = st.number_input("Random seed", min_value=0, value=0, step=1)
+            if st.button("Reload Inventory"):
+                invalidate_inventory()
+
+        # Shared, process-wide inventory graph; the session only keeps its selections
+        inventory = load_synthetic_inventory(int(num_systems), int(inventory_seed))
+
+    stored = inventory is None
+    if not stored and st.sidebar.button("Save to SQLite store"):
+        save_inventory(inventory)
+        st.sidebar.success(f"Saved {len(inventory.store)} systems to {get_sqlite_store().path}")
+
+    # Apply dependency changes appended to a JSON Lines file as they arrive
+    if not stored:
+        with st.sidebar.expander("Dependency Changes"):
+            feed_path = st.text_input(
+                "Watch JSON Lines file",
+                key="dependency_feed_path",
+                placeholder="dependency_changes.jsonl",
+                help='One event per line: {"op": "add" or "remove", "source": ..., "target": ..., "dependency_type": ...}'
+            )
+            if feed_path.strip():
+                watch_dependency_feed(inventory, feed_path.strip(), inventory.graph_hash)
+
+    # Sidebar for layout selection
+    layout_type = st.sidebar.radio(
+        "Select Layout Type",
+        ["Force-Directed", "Hierarchical"],
+        key="layout_selector"
+    )
+
+    if stored:
+        search_index = stored_search_index(sqlite_store.path, sqlite_store.version)
+    else:
+        search_index = inventory_search_index(inventory)
+
+    # Rank the whole inventory by blast radius in one batched pass
+    if not stored and st.sidebar.checkbox("Rank all systems by impact", key="rank_all_systems"):
+        st.subheader("Impact Ranking")
+        st.dataframe(
+            rank_systems_by_impact(inventory),
+            width="stretch",
+            hide_index=True
+        )
+
+    analyse_systems(inventory, search_index, layout_type)
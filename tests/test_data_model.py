@@ -0,0 +1,58 @@
+import pytest
+import yaml
+
+from data_model import SchemaError, compile_schema
+
+COLORS = {"module": "#111111", "submodule": "#222222", "subgroup": "#333333", "field": "#444444"}
+
+
+def _schema(**overrides):
+    schema = {
+        "version": "V1",
+        "root": "Root",
+        "color_schemes": {"systems": dict(COLORS)},
+        "entities": {"root": ["Root"], "systems.module": ["Systems"], "systems.field": ["Name"]},
+        "links": {"Root": ["Systems"], "Systems": [{"to": "Name", "label": "has"}]},
+    }
+    schema.update(overrides)
+    return schema
+
+
+def _compile(tmp_path, schema):
+    path = tmp_path / "data_model_V1.yaml"
+    path.write_text(yaml.safe_dump(schema), encoding="utf-8")
+    return compile_schema(str(path))
+
+
+def test_valid_schema_compiles(tmp_path):
+    artifact = _compile(tmp_path, _schema())
+    assert artifact["edges"] == [("Root", "Systems", "", ""), ("Systems", "Name", "has", "")]
+    assert artifact["warnings"] == []
+
+
+def test_missing_tier_colour(tmp_path):
+    colors = dict(COLORS)
+    del colors["subgroup"]
+    with pytest.raises(SchemaError, match="'systems' has no colour for subgroup"):
+        _compile(tmp_path, _schema(color_schemes={"systems": colors}))
+
+
+def test_link_without_target(tmp_path):
+    with pytest.raises(SchemaError, match="A link of 'Systems' has no 'to'"):
+        _compile(tmp_path, _schema(links={"Root": ["Systems"], "Systems": [{"label": "has"}]}))
+
+
+def test_empty_links(tmp_path):
+    with pytest.raises(SchemaError, match="'links' must be a mapping"):
+        _compile(tmp_path, _schema(links=None))
+
+
+def test_duplicate_link(tmp_path):
+    links = {"Root": ["Systems"], "Systems": ["Name", {"to": "Name", "label": "has"}]}
+    with pytest.raises(SchemaError, match="Link Systems -> Name is declared more than once"):
+        _compile(tmp_path, _schema(links=links))
+
+
+def test_self_link(tmp_path):
+    with pytest.raises(SchemaError, match="'Systems' links to itself"):
+        _compile(tmp_path, _schema(links={"Root": ["Systems"], "Systems": ["Systems", "Name"]}))
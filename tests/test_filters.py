@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from filters import FilterError, SystemFilter
+from inventory import SystemStore
+
+# Criticality codes: Others 0, SII 1, High 2; -1 (or NaT) is Unknown
+COLUMNS = {
+    "System Criticality": np.array([2, 2, 1, 0, -1], dtype=np.int8),
+    "System Status": np.array([0, 1, 0, 2, 0], dtype=np.int8),
+    "Agency Name": np.array([2, 0, 2, 1, 2], dtype=np.int8),
+    "RTO": np.array([4, 24, -1, 72, 1], dtype=np.int16),
+    "Operational Date": np.array(["2020-01-01", "2023-06-30", "NaT", "2019-05-05", "2024-01-01"], dtype="datetime64[D]"),
+}
+
+
+def _rows(expression):
+    store = SystemStore({column: values.copy() for column, values in COLUMNS.items()})
+    return SystemFilter(expression).rows(store).tolist()
+
+
+def test_and_binds_tighter_than_or():
+    assert _rows("criticality = Others OR criticality = High AND status = Inactive") == [1, 3]
+    assert str(SystemFilter("criticality = Others OR criticality = High AND status = Inactive")) == (
+        'System Criticality = "Others" OR (System Criticality = "High" AND System Status = "Inactive")'
+    )
+
+
+def test_parentheses_override_precedence():
+    assert _rows("(criticality = Others OR criticality = High) AND status = Inactive") == [1]
+
+
+def test_negation():
+    assert _rows("NOT criticality = High") == [2, 3, 4]
+    assert _rows("NOT (agency = Agency 3 OR status = Maintenance)") == [1]
+    assert _rows("NOT NOT status = Active") == [0, 2, 4]
+
+
+def test_in_unknown_and_comparisons():
+    assert _rows("criticality IN (SII, Unknown)") == [2, 4]
+    assert _rows('agency = "Agency 3" AND status != Active') == []
+    # Missing numbers and dates never satisfy an ordering
+    assert _rows("RTO <= 24") == [0, 1, 4]
+    assert _rows("rto = Unknown") == [2]
+    assert _rows("Operational Date >= 2023-01-01") == [1, 4]
+
+
+def test_unknown_field():
+    with pytest.raises(FilterError, match="Unknown field 'owner'"):
+        SystemFilter("owner = Finance")
+
+
+def test_unknown_value():
+    with pytest.raises(FilterError, match="Unknown System Criticality 'Hgh'"):
+        SystemFilter("criticality = Hgh")
+    with pytest.raises(FilterError, match="RTO needs a number"):
+        SystemFilter("RTO < soon")
+    with pytest.raises(FilterError, match="only compares numbers and dates"):
+        SystemFilter("criticality > SII")
+
+
+@pytest.mark.parametrize("expression", ["", "   "])
+def test_empty_filter(expression):
+    with pytest.raises(FilterError, match="Empty filter"):
+        SystemFilter(expression)
+
+
+@pytest.mark.parametrize("expression", ["(status = Active", "status = Active)", "status Active", "status = Active AND"])
+def test_malformed_filter(expression):
+    with pytest.raises(FilterError):
+        SystemFilter(expression)
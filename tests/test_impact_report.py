@@ -0,0 +1,43 @@
+import sqlite3
+
+import pandas as pd
+
+from impact_report import main
+from sqlite_store import SqliteStore
+
+
+def test_empty_sqlite_store(tmp_path, capsys):
+    path = str(tmp_path / "inventory.db")
+    SqliteStore(path).close()
+
+    assert main(["--sqlite", path]) == 1
+    assert capsys.readouterr().err == f"error: No inventory saved in {path}\n"
+
+
+def test_file_that_is_not_a_database(tmp_path, capsys):
+    path = tmp_path / "inventory.db"
+    path.write_text("System ID,System Name\n", encoding="utf-8")
+
+    assert main(["--sqlite", str(path)]) == 1
+    assert capsys.readouterr().err.startswith("error: file is not a database")
+
+
+def test_unreadable_store(tmp_path, capsys):
+    path = str(tmp_path / "inventory.db")
+    SqliteStore(path).close()
+    with sqlite3.connect(path) as connection:
+        connection.execute("INSERT INTO columns VALUES ('Age', 'int64', 0)")
+
+    assert main(["--sqlite", path]) == 1
+    assert capsys.readouterr().err == "error: no such table: systems\n"
+
+
+def test_streamed_report_matches_ranked(tmp_path):
+    streamed, ranked = tmp_path / "streamed.csv", tmp_path / "ranked.csv"
+    assert main(["--synthetic", "3000", "--processes", "1", "-o", str(streamed)]) == 0
+    assert main(["--synthetic", "3000", "--processes", "1", "--ranked", "-o", str(ranked)]) == 0
+
+    streamed, ranked = pd.read_csv(streamed), pd.read_csv(ranked)
+    assert streamed["System"].tolist() == [f"System {i}" for i in range(1, 3001)]
+    assert ranked["Weighted Impact"].is_monotonic_decreasing
+    assert ranked.sort_values("System").reset_index(drop=True).equals(streamed.sort_values("System").reset_index(drop=True))
@@ -0,0 +1,71 @@
+import io
+
+import pytest
+
+import ingest
+from data_model import SchemaError
+from ingest import IngestError, ingest_inventory
+from inventory import RML_ALIGNMENT, RML_LEVELS
+
+SYSTEMS = """System ID,System Name,Agency Name,Ministry Family,System Criticality
+SYS1,Payroll,Agency 1,MF 1,High
+SYS2,Payroll,Agency 1,MF 1,SII
+SYS3,HR,Agency 2,MF 1,Others
+"""
+
+DEPENDENCIES = """System ID,Dependent System,Dependency Type
+SYS1,SYS3,Downstream
+SYS2,SYS3,Downstream
+"""
+
+
+def test_duplicate_system_name_is_rejected():
+    store, dependencies, reports = ingest_inventory(io.StringIO(SYSTEMS), io.StringIO(DEPENDENCIES))
+
+    assert store.names == ["Payroll", "HR"]
+    assert reports["systems"]["error_count"] == 1
+    assert reports["systems"]["errors"] == [(3, "Duplicate System Name")]
+    # The rejected system's dependency is reported instead of silently merged into the first Payroll
+    assert len(dependencies["source"]) == 1
+    assert reports["dependencies"]["errors"] == [(3, "Unknown System ID")]
+
+
+def test_duplicate_system_name_across_chunks_is_rejected():
+    store, _, reports = ingest_inventory(io.StringIO(SYSTEMS), chunksize=1)
+
+    assert store.names == ["Payroll", "HR"]
+    assert reports["systems"]["errors"] == [(3, "Duplicate System Name")]
+
+
+def test_duplicate_system_id_is_rejected():
+    systems = SYSTEMS.replace("SYS2,Payroll", "SYS1,Payroll 2")
+    store, _, reports = ingest_inventory(io.StringIO(systems))
+
+    assert store.names == ["Payroll", "HR"]
+    assert reports["systems"]["errors"] == [(3, "Duplicate System ID")]
+
+
+def test_computed_rml_follows_the_rules():
+    systems = (
+        "System ID,System Name,Agency Name,Ministry Family,System Criticality,Security Classification,"
+        "Sensitivity Classification,Computed RML,Endorsed RML,RML Alignment\n"
+        "SYS1,Payroll,Agency 1,MF 1,Others,Secret,Non-Sensitive,Hgh,High,Partly\n"
+        "SYS2,HR,Agency 1,MF 1,SII,Official,Sensitive Normal,High,Medium,Not Aligned\n"
+    )
+    store, _, reports = ingest_inventory(io.StringIO(systems))
+
+    # The derived headers are ignored, so their values cannot reject a system
+    assert reports["systems"]["rows_loaded"] == 2
+    assert reports["systems"]["ignored_columns"] == ["Computed RML", "RML Alignment"]
+
+    assert [RML_LEVELS[code] for code in store.columns["Computed RML"]] == ["High", "Medium"]
+    assert [RML_ALIGNMENT[code] for code in store.columns["RML Alignment"]] == ["Aligned", "Aligned"]
+
+
+def test_malformed_data_model_is_an_ingest_error(monkeypatch):
+    def broken():
+        raise SchemaError("missing links")
+
+    monkeypatch.setattr(ingest, "load_data_model", broken)
+    with pytest.raises(IngestError, match="missing links"):
+        ingest_inventory(io.StringIO(SYSTEMS))
@@ -0,0 +1,22 @@
+import numpy as np
+
+from inventory import CATEGORIES, generate_inventory, score_rml, update_rml_input
+
+
+def test_update_rml_input_matches_full_rescore():
+    columns, _ = generate_inventory(500, seed=3)
+    rng = np.random.default_rng(0)
+    for field in ["System Criticality", "Security Classification", "Sensitivity Classification", "Endorsed RML"]:
+        rows = rng.choice(500, size=60, replace=False)
+        values = rng.integers(-1, len(CATEGORIES[field]), size=60).astype(np.int8)
+        before = columns["Computed RML"].copy()
+        untouched = np.setdiff1d(np.arange(500), rows)
+
+        changed = update_rml_input(columns, field, rows, values)
+
+        expected = {name: column.copy() for name, column in columns.items()}
+        score_rml(expected)
+        assert (columns["Computed RML"] == expected["Computed RML"]).all()
+        assert (columns["RML Alignment"] == expected["RML Alignment"]).all()
+        assert set(changed.tolist()) == set(np.flatnonzero(columns["Computed RML"] != before).tolist())
+        assert (columns["Computed RML"][untouched] == before[untouched]).all()
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+import impact
+from inventory import DEPENDENCY_TYPES, SystemStore, dependency_triples, generate_inventory
+from inventory_graph import InventoryGraph
+
+
+def _assert_matches_rebuild(inventory):
+    fresh = InventoryGraph(inventory.store, list(inventory.dependencies))
+    assert inventory.edge_count == fresh.edge_count
+    assert set(inventory.graph.edges()) == set(fresh.graph.edges())
+    assert set(inventory.impact_graph().edges()) == set(fresh.impact_graph().edges())
+    reachability, connectivity = inventory.reachability(), inventory.connectivity()
+    for name in inventory.store.names:
+        assert reachability.downstream(name) == fresh.reachability().downstream(name)
+        assert reachability.upstream(name) == fresh.reachability().upstream(name)
+        assert reachability.downstream_count(name) == fresh.reachability().downstream_count(name)
+        assert reachability.upstream_count(name) == fresh.reachability().upstream_count(name)
+        assert connectivity.impacted(name) == fresh.connectivity().impacted(name)
+
+
+# A limit of 0 makes the reachability index walk the condensation instead of keeping bitset closures
+@pytest.mark.parametrize("closure_limit", [impact.CLOSURE_LIMIT, 0], ids=["bitsets", "walks"])
+@pytest.mark.parametrize("seed", range(6))
+def test_random_change_batches_match_a_rebuild(monkeypatch, closure_limit, seed):
+    monkeypatch.setattr(impact, "CLOSURE_LIMIT", closure_limit)
+    rng = random.Random(seed)
+    columns, dependencies = generate_inventory(rng.choice([12, 40]), seed=seed)
+    inventory = InventoryGraph(SystemStore(columns), dependency_triples(dependencies))
+    names = inventory.store.names
+    # Build every index first, so the batches below update them rather than rebuild them
+    _assert_matches_rebuild(inventory)
+
+    updated = 0
+    for _ in range(12):
+        events = []
+        for _ in range(rng.randint(1, 5)):
+            if inventory.dependencies and rng.random() < 0.5:
+                events.append(("remove", *rng.choice(list(inventory.dependencies))))
+            else:
+                events.append(("add", rng.choice(names), rng.choice(names), rng.choice(DEPENDENCY_TYPES)))
+        inventory.apply_changes(events)
+        # An edge that merges strongly connected components drops the reachability index instead
+        updated += "reachability" in inventory._memo
+        assert "connectivity" in inventory._memo
+        _assert_matches_rebuild(inventory)
+    assert updated
@@ -0,0 +1,54 @@
+from inventory import SystemStore, generate_inventory
+from search import SearchIndex, store_search_index
+
+NAMES = ["Payroll", "Payment Gateway", "HR Portal"]
+FIELDS = {
+    "System ID": ["SYS1", "SYS2", "SYS3"],
+    "Agency Name": ["Agency 1", "Agency 1", "Agency 2"],
+    "Ministry Family": ["MF 1", "MF 1", "MF 2"],
+}
+
+
+def test_typo_matches_through_trigrams():
+    index = SearchIndex(NAMES, FIELDS)
+
+    assert index.search("payrol") == ["Payroll"]
+    assert index.search("gatway")[0] == "Payment Gateway"
+
+
+def test_saved_index_answers_like_the_built_one(tmp_path):
+    index = SearchIndex(NAMES, FIELDS)
+    path = str(tmp_path / "index.npz")
+    index.save(path, "v1")
+
+    loaded = SearchIndex.load(path, "v1")
+    assert loaded.names == NAMES
+    for query in ["", "pay", "gatway", "agency 2", "sys3"]:
+        assert loaded.search(query) == index.search(query)
+
+
+def test_stale_or_missing_index_is_not_loaded(tmp_path):
+    path = str(tmp_path / "index.npz")
+    assert SearchIndex.load(path, "v1") is None
+    SearchIndex(NAMES, FIELDS).save(path, "v1")
+    assert SearchIndex.load(path, "v2") is None
+
+
+def test_multi_word_query_ranks_each_word_in_its_own_field():
+    columns, _ = generate_inventory(2000, seed=0)
+    store = SystemStore(columns)
+    index = store_search_index(store)
+    agencies, families = store.labels("Agency Name"), store.labels("Ministry Family Name")
+
+    for name in index.search("agency 3 mf 2"):
+        row = store.position(name)
+        assert (agencies[row], families[row]) == ("Agency 3", "MF 2")
+
+
+def test_numbers_match_whole_tokens():
+    fields = {field: values + [value] for (field, values), value in zip(FIELDS.items(), ["SYS4", "Agency 4", "MF 4"])}
+    index = SearchIndex(NAMES + ["Payroll 12"], fields)
+
+    assert index.search("payroll 1") == ["Payroll"]
+    # SYS2 holds a whole "2" token, but only HR Portal has it next to "mf"
+    assert index.search("mf 2") == ["HR Portal", "Payment Gateway"]
@@ -0,0 +1,45 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from inventory import SystemStore, generate_inventory
+from sqlite_store import SqliteStore
+
+
+def _store(names):
+    return SystemStore({"Age": np.arange(len(names), dtype=np.int64)}, names=names)
+
+
+def _dependencies(source, target, dep_type):
+    return {"source": np.array(source), "target": np.array(target), "type": np.array(dep_type)}
+
+
+def test_failed_save_keeps_previous_inventory(tmp_path):
+    with SqliteStore(str(tmp_path / "inventory.db")) as db:
+        db.save(_store(["System 1", "System 2"]), _dependencies([0], [1], [1]))
+        version = db.version
+
+        with pytest.raises(sqlite3.IntegrityError):
+            db.save(_store(["System 3", "System 3"]), _dependencies([], [], []))
+
+        assert db.names() == ["System 1", "System 2"]
+        assert db.dependency_count() == 1
+        assert db.version == version
+
+
+def test_saved_rml_is_scored(tmp_path):
+    columns, dependencies = generate_inventory(20, seed=1)
+    expected = columns["Computed RML"].copy()
+    columns["Computed RML"][:] = -1
+    with SqliteStore(str(tmp_path / "inventory.db")) as db:
+        db.save(SystemStore(columns), dependencies)
+        loaded, _ = db.load()
+        stored = db.column("Computed RML")
+        counts = db.counts("Computed RML")
+
+    assert (loaded.columns["Computed RML"] == expected).all()
+    assert (stored == expected).all()
+    assert counts == loaded.counts("Computed RML")
+    # The saved store itself is left as it was
+    assert (columns["Computed RML"] == -1).all()
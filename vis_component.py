@@ -0,0 +1,104 @@
+import json
+import os
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from render_cache import RenderCache
+
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "vis_network")
+
+_vis_network = components.declare_component("vis_network", path=FRONTEND_DIR)
+
+# Vendored vis-network bundle served from the component folder (cacheable, no network access needed)
+VENDORED_JS = "vis-network.min.js"
+VENDORED_CSS = "vis-network.min.css"
+
+
+def asset_url(filename):
+    """Returns the URL, relative to the app page, of a file in the component folder."""
+    return f"component/{_vis_network.name}/{filename}"
+
+
+# Digests of recently shown views, keyed by the caller's view key and shared by every session
+_view_digests = RenderCache(max_entries=64)
+
+
+def _digest(item):
+    return hash(json.dumps(item, sort_keys=True, default=str))
+
+
+def _digests(items, view_key, kind):
+    """Returns `{id: digest}` of `items`, computed once per `view_key` when one is given."""
+    if view_key is None:
+        return {item["id"]: _digest(item) for item in items}
+    return _view_digests.get_or_render((view_key, kind), lambda: {item["id"]: _digest(item) for item in items})
+
+
+def _diff(previous, current, items):
+    """Returns the `items` that are new or changed since `previous` and the ids that went away.
+
+    `previous` and `current` map ids to the `_digest` of the item sent or to be sent.
+    """
+    if previous is current:
+        return {"update": [], "remove": []}
+    changed = {item_id for item_id, digest in current.items() if previous.get(item_id) != digest}
+    return {
+        "update": [item for item in items if item["id"] in changed],
+        "remove": [item_id for item_id in previous if item_id not in current],
+    }
+
+
+def vis_network(
+    nodes, edges, options, height=800, key="vis_network", on_change=None, tooltip=None, tooltip_key=None, view_key=None
+):
+    """Shows a vis-network graph that stays alive across reruns and returns the id of the last clicked node.
+
+    Nodes and edges need an `id`. The browser keeps its network (and zoom/pan)
+    between reruns; each rerun only sends the nodes and edges that changed
+    since the previous one in this session, or the whole graph when the
+    frame asks to resync. `view_key` names the content of `nodes` and
+    `edges`: reruns showing the same view then skip the comparison, and each
+    view is digested once per process rather than on every rerun.
+
+    Nodes without a `title` get their tooltip on hover: the frame asks for it
+    and `tooltip(node_id)` answers. The browser keeps the answers until
+    `tooltip_key` changes.
+    """
+    value = st.session_state.get(key) or {}
+    resync = value.get("resync", 0)
+    sent_key = f"{key}:sent"
+    sent = st.session_state.get(sent_key)
+    node_digests, edge_digests = _digests(nodes, view_key, "nodes"), _digests(edges, view_key, "edges")
+
+    # Only the digests are kept for the next diff, not a copy of the graph per session
+    if sent is None or sent["resync"] != resync:
+        revision = (sent["revision"] if sent else 0) + 1
+        base = None
+        node_diff, edge_diff = _diff({}, node_digests, nodes), _diff({}, edge_digests, edges)
+    else:
+        node_diff, edge_diff = _diff(sent["nodes"], node_digests, nodes), _diff(sent["edges"], edge_digests, edges)
+        changed = any(node_diff.values()) or any(edge_diff.values())
+        base = sent["revision"]
+        revision = base + 1 if changed else base
+    st.session_state[sent_key] = {"revision": revision, "resync": resync, "nodes": node_digests, "edges": edge_digests}
+
+    hovered = value.get("hover") if value.get("event") == "hover" else None
+    answer = {"id": hovered, "text": tooltip(hovered)} if tooltip and hovered is not None else None
+
+    if isinstance(options, str):
+        options = json.loads(options)
+    result = _vis_network(
+        nodes=node_diff,
+        edges=edge_diff,
+        base=base,
+        revision=revision,
+        options=options,
+        height=height,
+        tooltip=answer,
+        tooltip_key=tooltip_key,
+        key=key,
+        on_change=on_change,
+        default=None,
+    )
+    return (result or {}).get("selected")
@@ -0,0 +1,102 @@
+import json
+
+VIS_NETWORK_JS = "https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/vis-network.min.js"
+VIS_NETWORK_CSS = "https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/dist/vis-network.min.css"
+
+FULLSCREEN_HTML = """
+<button
+    style="
+        position: fixed;
+        top: 20px;
+        right: 20px;
+        z-index: 10000;
+        padding: 8px 16px;
+        background-color: #4CAF50;
+        color: white;
+        border: none;
+        border-radius: 4px;
+        cursor: pointer;
+        font-family: Arial, sans-serif;
+        font-size: 14px;
+    "
+    onclick="toggleFullscreen()"
+>
+    Full Screen
+</button>
+<script>
+    function toggleFullscreen() {
+        let elem = document.documentElement;
+        if (!document.fullscreenElement) {
+            if (elem.requestFullscreen) {
+                elem.requestFullscreen();
+            } else if (elem.webkitRequestFullscreen) {
+                elem.webkitRequestFullscreen();
+            } else if (elem.msRequestFullscreen) {
+                elem.msRequestFullscreen();
+            }
+        } else {
+            if (document.exitFullscreen) {
+                document.exitFullscreen();
+            } else if (document.webkitExitFullscreen) {
+                document.webkitExitFullscreen();
+            } else if (document.msExitFullscreen) {
+                document.msExitFullscreen();
+            }
+        }
+    }
+</script>
+"""
+
+PAGE_TEMPLATE = """<html>
+<head>
+<meta charset="utf-8">
+<link rel="stylesheet" href="{css_url}" />
+<script src="{js_url}"></script>
+<style>
+    body {{ margin: 0; }}
+    #mynetwork {{ width: {width}; height: {height}; background-color: {bgcolor}; }}
+</style>
+</head>
+<body>
+<div id="mynetwork"></div>
+<script>
+    var nodes = new vis.DataSet({nodes});
+    var edges = new vis.DataSet({edges});
+    var network = new vis.Network(
+        document.getElementById("mynetwork"), {{nodes: nodes, edges: edges}}, {options}
+    );
+</script>
+{extra}
+</body>
+</html>
+"""
+
+
+def to_json(value):
+    # Escape closing tags so node labels can never terminate the inline script
+    return json.dumps(value, separators=(",", ":"), default=str).replace("</", "<\\/")
+
+
+def render_html(
+    nodes, edges, options, height="800px", width="100%", bgcolor="#ffffff", fullscreen=False, extra_html="",
+    js_url=VIS_NETWORK_JS, css_url=VIS_NETWORK_CSS
+):
+    """Renders vis-network node/edge lists and options to a standalone HTML page in memory.
+
+    `extra_html` is appended after the network is created, so its scripts can
+    use the `nodes`, `edges` and `network` globals. The library is loaded from
+    the CDN unless `js_url`/`css_url` point at a self-hosted copy.
+    """
+    if isinstance(options, str):
+        options = json.loads(options)
+    return PAGE_TEMPLATE.format(
+        css_url=css_url,
+        js_url=js_url,
+        width=width,
+        height=height,
+        bgcolor=bgcolor,
+        nodes=to_json(nodes),
+        edges=to_json(edges),
+        options=to_json(options),
+        extra=(FULLSCREEN_HTML if fullscreen else "") + extra_html,
+    )